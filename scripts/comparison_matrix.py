@@ -0,0 +1,275 @@
+"""
+Accuracy-versus-speed matrix for the Compare exercise flow
+Website: localhost:3000
+
+Runs Part 2 (compare knee extension against a video) for every combination of
+- fixture fidelity: the video re-encoded at lower resolution / frame rate (ffmpeg)
+- throttling profile: Chrome CPU throttling via the DevTools protocol
+
+After test_with_video_file it reads the app's comparison result (score, reps,
+feedback) and the latency from starting the upload to the result appearing.
+Each cell's drift is measured against the full-fidelity, unthrottled run, and
+the fastest configuration whose drift stays within tolerance is reported.
+
+Usage:
+    python comparison_matrix.py
+    python comparison_matrix.py --fidelity full --fidelity 480p-15fps --throttling none --throttling low-end
+    python comparison_matrix.py --score-tolerance 3 --reps-tolerance 1
+"""
+
+from datetime import datetime
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import time
+import traceback
+
+from driver_factory import execute_cdp
+from result_cache import REPO_DIR, file_digest
+from test_part2_compare_exercise import ExerciseComparisonPart2
+from video_upload import KNEE_EXTENSION_VIDEO, fixture_path
+
+# name -> ffmpeg video filter; None uploads the original file
+FIDELITY_LEVELS = {
+    "full": None,
+    "720p": "scale=-2:720",
+    "480p-15fps": "scale=-2:480,fps=15",
+    "360p-10fps": "scale=-2:360,fps=10",
+}
+
+# name -> CPU slowdown factor for Emulation.setCPUThrottlingRate
+THROTTLING_PROFILES = {
+    "none": 1,
+    "mid-tier": 4,
+    "low-end": 6,
+}
+
+REFERENCE = ("full", "none")
+FIXTURES_DIR = os.path.join(REPO_DIR, ".harness", "fixtures")
+MATRIX_DIR = os.path.join(REPO_DIR, ".harness", "comparison-matrix")
+
+
+def prepare_fixture(filename, level):
+    """Path of the video at the given fidelity, transcoding it once per source content"""
+    source = fixture_path(filename)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"{filename} is not in the test-videos folder: {os.path.dirname(source)}")
+    video_filter = FIDELITY_LEVELS[level]
+    if video_filter is None:
+        return source
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required for reduced fidelity fixtures")
+
+    target = os.path.join(FIXTURES_DIR, f"{file_digest(source)[:16]}-{level}.mp4")
+    if not os.path.exists(target):
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        partial = target + ".partial"
+        print(f"Transcoding {filename} to {level}...")
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", source, "-vf", video_filter, "-an",
+                        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-f", "mp4", partial],
+                       check=True)
+        os.replace(partial, target)
+    return target
+
+
+def apply_throttling(driver, profile):
+    execute_cdp(driver, "Emulation.setCPUThrottlingRate", {"rate": THROTTLING_PROFILES[profile]})
+
+
+class MatrixCell:
+    def __init__(self, fidelity, throttling, result=None, latency=None, upload_seconds=None, error=None):
+        self.fidelity = fidelity
+        self.throttling = throttling
+        self.result = result
+        self.latency = latency
+        self.upload_seconds = upload_seconds
+        self.error = error
+
+    def drift(self, reference):
+        """(score drift, rep drift, changed feedback lines) against the reference cell"""
+        if self.result is None or reference is None or reference.result is None:
+            return None
+        ours, theirs = self.result, reference.result
+        score = abs(ours.score - theirs.score) if None not in (ours.score, theirs.score) else None
+        reps = abs(ours.reps - theirs.reps) if None not in (ours.reps, theirs.reps) else None
+        feedback = len(set(ours.feedback) ^ set(theirs.feedback))
+        return score, reps, feedback
+
+    def within_tolerance(self, reference, score_tolerance, reps_tolerance):
+        drift = self.drift(reference)
+        if drift is None:
+            return False
+        score, reps, _ = drift
+        # a cell that shares no metric with the reference cannot be shown to agree with it
+        if score is None and reps is None:
+            return False
+        return ((score is None or score <= score_tolerance)
+                and (reps is None or reps <= reps_tolerance))
+
+    def to_dict(self, reference=None):
+        drift = self.drift(reference)
+        return {
+            "fidelity": self.fidelity,
+            "throttling": self.throttling,
+            "result": self.result.to_dict() if self.result else None,
+            "latency_seconds": self.latency,
+            "upload_seconds": self.upload_seconds,
+            "drift": dict(zip(["score", "reps", "feedback_lines"], drift)) if drift else None,
+            "error": self.error,
+        }
+
+
+class ComparisonMatrix:
+    def __init__(self, base_url="http://localhost:3000", endpoint=None,
+                 filename=KNEE_EXTENSION_VIDEO, fidelity_levels=None, throttling_profiles=None,
+                 score_tolerance=5.0, reps_tolerance=0, result_timeout=180):
+        self.base_url = base_url
+        self.endpoint = endpoint
+        self.filename = filename
+        self.fidelity_levels = fidelity_levels or list(FIDELITY_LEVELS)
+        self.throttling_profiles = throttling_profiles or list(THROTTLING_PROFILES)
+        self.score_tolerance = score_tolerance
+        self.reps_tolerance = reps_tolerance
+        self.result_timeout = result_timeout
+        self.cells = {}
+
+    def run_cell(self, test, fidelity, throttling):
+        print("=" * 60)
+        print(f"Fidelity {fidelity}, throttling {throttling}")
+        print("=" * 60)
+        try:
+            path = prepare_fixture(self.filename, fidelity)
+            # every cell reloads the app, so nothing located in the previous cell is reused
+            test.create_pages()
+            test.navigate_to_home()
+            test.click_ok_after_save()
+            test.go_to_home()
+            test.click_knee_extension_compare()
+            test.record_with_webcam()
+
+            apply_throttling(test.driver, throttling)
+            start_time = time.time()
+            test.test_with_video_file(path)
+            result, _ = test.read_comparison_result(self.result_timeout)
+            latency = time.time() - start_time if result else None
+            upload_seconds = test.uploader.timings[-1].total_seconds if test.uploader.timings else None
+            return MatrixCell(fidelity, throttling, result, latency, upload_seconds)
+        except Exception as e:
+            traceback.print_exc()
+            return MatrixCell(fidelity, throttling, error=str(e))
+        finally:
+            try:
+                apply_throttling(test.driver, "none")
+            except Exception:
+                pass
+
+    def run(self):
+        test = ExerciseComparisonPart2(base_url=self.base_url, endpoint=self.endpoint)
+        try:
+            test.setup_driver()
+            for fidelity in self.fidelity_levels:
+                for throttling in self.throttling_profiles:
+                    self.cells[(fidelity, throttling)] = self.run_cell(test, fidelity, throttling)
+        finally:
+            if test.driver:
+                test.driver.quit()
+        return self
+
+    @property
+    def reference(self):
+        return self.cells.get(REFERENCE)
+
+    def cheapest(self):
+        """Lowest latency cell whose drift against the reference is within tolerance"""
+        candidates = [cell for cell in self.cells.values()
+                      if cell.latency is not None
+                      and cell.within_tolerance(self.reference, self.score_tolerance, self.reps_tolerance)]
+        return min(candidates, key=lambda cell: cell.latency, default=None)
+
+    def print_matrix(self):
+        print("=" * 60)
+        print(f"Accuracy drift vs latency for {self.filename} "
+              f"(reference {REFERENCE[0]}/{REFERENCE[1]}, * = within tolerance)")
+        print("cell: score drift / rep drift @ latency")
+        width = 24
+        print(f"{'fidelity':<12}" + "".join(f"{profile:>{width}}" for profile in self.throttling_profiles))
+        for fidelity in self.fidelity_levels:
+            row = f"{fidelity:<12}"
+            for throttling in self.throttling_profiles:
+                row += f"{self._format_cell(self.cells.get((fidelity, throttling))):>{width}}"
+            print(row)
+
+        cheapest = self.cheapest()
+        if cheapest:
+            print(f"Cheapest within tolerance: {cheapest.fidelity} / {cheapest.throttling} "
+                  f"({cheapest.latency:.1f}s)")
+        else:
+            print("No configuration stayed within tolerance")
+        print("=" * 60)
+
+    def _format_cell(self, cell):
+        if cell is None:
+            return "-"
+        if cell.result is None:
+            return "error" if cell.error else "no result"
+        drift = cell.drift(self.reference)
+        if drift is None:
+            return f"? @ {cell.latency:.1f}s"
+        score, reps, _ = drift
+        mark = "*" if cell.within_tolerance(self.reference, self.score_tolerance, self.reps_tolerance) else " "
+        score_text = f"{score:.1f}" if score is not None else "?"
+        reps_text = f"{reps}" if reps is not None else "?"
+        return f"{mark}{score_text} / {reps_text} @ {cell.latency:.1f}s"
+
+    def save(self, directory=MATRIX_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+        cheapest = self.cheapest()
+        with open(path, "w") as f:
+            json.dump({
+                "video": self.filename,
+                "base_url": self.base_url,
+                "reference": list(REFERENCE),
+                "score_tolerance": self.score_tolerance,
+                "reps_tolerance": self.reps_tolerance,
+                "cheapest": [cheapest.fidelity, cheapest.throttling] if cheapest else None,
+                "cells": [cell.to_dict(self.reference) for cell in self.cells.values()],
+            }, f, indent=2)
+        print(f"Matrix saved to {path}")
+        return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare exercise accuracy drift against latency")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--endpoint", default=None, help="'local' (default) or a WebDriver server URL")
+    parser.add_argument("--video", default=KNEE_EXTENSION_VIDEO, help="video in test-videos")
+    parser.add_argument("--fidelity", action="append", choices=list(FIDELITY_LEVELS),
+                        help="fidelity level to run; repeat for more (default: all)")
+    parser.add_argument("--throttling", action="append", choices=list(THROTTLING_PROFILES),
+                        help="throttling profile to run; repeat for more (default: all)")
+    parser.add_argument("--score-tolerance", type=float, default=5.0,
+                        help="largest acceptable score drift from the reference")
+    parser.add_argument("--reps-tolerance", type=int, default=0,
+                        help="largest acceptable rep count drift from the reference")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    fidelity_levels = args.fidelity or list(FIDELITY_LEVELS)
+    throttling_profiles = args.throttling or list(THROTTLING_PROFILES)
+    # drift is measured against the full-fidelity, unthrottled run, so always include it
+    if REFERENCE[0] not in fidelity_levels:
+        fidelity_levels.insert(0, REFERENCE[0])
+    if REFERENCE[1] not in throttling_profiles:
+        throttling_profiles.insert(0, REFERENCE[1])
+
+    matrix = ComparisonMatrix(base_url=args.base_url, endpoint=args.endpoint, filename=args.video,
+                              fidelity_levels=fidelity_levels, throttling_profiles=throttling_profiles,
+                              score_tolerance=args.score_tolerance, reps_tolerance=args.reps_tolerance)
+    matrix.run()
+    matrix.print_matrix()
+    matrix.save()
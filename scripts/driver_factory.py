@@ -0,0 +1,219 @@
+"""
+Shared WebDriver construction for the Selenium scripts
+
+An endpoint is either None / "local" (chromedriver on this machine) or the URL
+of a running WebDriver server, e.g. a chromedriver started with
+`chromedriver --port=9515` (http://localhost:9515) or a Selenium Grid hub
+(http://localhost:4444/wd/hub).
+
+Local startup is kept short:
+- the chromedriver binary resolved by webdriver-manager and its version check
+  are cached in .harness/chromedriver.json for DRIVER_CACHE_TTL seconds
+- one persistent chromedriver service is left running in the background and
+  every later local session attaches to it instead of launching its own
+- selenium.webdriver is only imported once a driver is created, while the
+  chromedriver service is booting
+
+If Chrome rejects the session because it was updated past the cached
+chromedriver, the cache and the persistent service are dropped and the driver
+is resolved again once.
+
+Set HARNESS_PERSISTENT_DRIVER=0 to launch a private chromedriver per session.
+Stop the background service with `python driver_factory.py stop`.
+"""
+
+from selenium.common.exceptions import SessionNotCreatedException
+from urllib.request import urlopen
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+LOCAL_ENDPOINT = "local"
+
+HARNESS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".harness")
+DRIVER_CACHE_PATH = os.path.join(HARNESS_DIR, "chromedriver.json")
+SERVICE_STATE_PATH = os.path.join(HARNESS_DIR, "chromedriver-service.json")
+DRIVER_CACHE_TTL = 24 * 3600
+SERVICE_START_TIMEOUT = 10
+
+_service_lock = threading.Lock()
+
+
+def build_chrome_options():
+    """Chrome options shared by every script"""
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--use-fake-ui-for-media-stream')
+    options.add_argument('--use-fake-device-for-media-stream')
+    return options
+
+
+def is_local_endpoint(endpoint):
+    return endpoint in (None, "", LOCAL_ENDPOINT)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def resolve_chromedriver():
+    """Path of a chromedriver matching the installed Chrome, cached for DRIVER_CACHE_TTL"""
+    cached = _read_json(DRIVER_CACHE_PATH)
+    if (cached and os.path.exists(cached["path"])
+            and time.time() - cached["resolved_at"] < DRIVER_CACHE_TTL):
+        return cached["path"]
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    version = subprocess.run([path, "--version"], capture_output=True, text=True).stdout.strip()
+    _write_json(DRIVER_CACHE_PATH, {"path": path, "version": version, "resolved_at": time.time()})
+    print(f"Resolved {version} at {path}")
+    return path
+
+
+def _service_ready(url):
+    try:
+        with urlopen(f"{url}/status", timeout=1) as response:
+            return json.load(response)["value"].get("ready", False)
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PersistentService:
+    """Background chromedriver shared by local sessions across runs"""
+
+    def __init__(self, url):
+        self.url = url
+
+    @classmethod
+    def ensure_started(cls):
+        """Attach to the running service, or launch one without waiting for it to boot"""
+        state = _read_json(SERVICE_STATE_PATH)
+        if state and _service_ready(state["url"]):
+            return cls(state["url"])
+
+        port = _free_port()
+        process = subprocess.Popen([resolve_chromedriver(), f"--port={port}"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        url = f"http://127.0.0.1:{port}"
+        _write_json(SERVICE_STATE_PATH, {"url": url, "pid": process.pid})
+        print(f"Started persistent chromedriver service at {url} (pid {process.pid})")
+        return cls(url)
+
+    def wait_ready(self, timeout=SERVICE_START_TIMEOUT):
+        deadline = time.time() + timeout
+        while not _service_ready(self.url):
+            if time.time() > deadline:
+                raise RuntimeError(f"chromedriver service at {self.url} did not start within {timeout}s")
+            time.sleep(0.05)
+        return self.url
+
+
+def execute_cdp(driver, command, params=None):
+    """Run a Chrome DevTools Protocol command on a local or remote Chrome session"""
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(command, params or {})
+    # webdriver.Remote has no CDP helper, but _remote_chrome's connection maps the command
+    return driver.execute("executeCdpCommand", {"cmd": command, "params": params or {}})["value"]
+
+
+def stop_persistent_service():
+    state = _read_json(SERVICE_STATE_PATH)
+    if not state:
+        print("No persistent chromedriver service recorded")
+        return
+    try:
+        os.kill(state["pid"], signal.SIGTERM)
+        print(f"Stopped chromedriver service {state['url']} (pid {state['pid']})")
+    except OSError as e:
+        print(f"Could not stop chromedriver service pid {state['pid']}: {e}")
+    os.remove(SERVICE_STATE_PATH)
+
+
+def invalidate_chromedriver(stale_cache):
+    """Drop the driver cache and the service running it, unless another session already did"""
+    with _service_lock:
+        if _read_json(DRIVER_CACHE_PATH) != stale_cache:
+            return
+        stop_persistent_service()
+        if os.path.exists(DRIVER_CACHE_PATH):
+            os.remove(DRIVER_CACHE_PATH)
+
+
+def _remote_chrome(url, options):
+    """Remote session whose connection also knows Chrome's vendor commands (CDP)"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+
+    return webdriver.Remote(command_executor=ChromeRemoteConnection(url), options=options)
+
+
+def _local_chrome():
+    if os.environ.get("HARNESS_PERSISTENT_DRIVER", "1") != "0":
+        try:
+            with _service_lock:
+                service = PersistentService.ensure_started()
+                # build_chrome_options imports selenium.webdriver while chromedriver boots
+                options = build_chrome_options()
+                url = service.wait_ready()
+            return _remote_chrome(url, options)
+        except SessionNotCreatedException:
+            # a private chromedriver from the same cache would be rejected too
+            raise
+        except Exception as e:
+            print(f"Persistent chromedriver unavailable ({e}), launching a private one...")
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    try:
+        service = Service(resolve_chromedriver())
+    except Exception as e:
+        print(f"Could not resolve chromedriver ({e}), leaving it to Selenium Manager...")
+        service = None
+    return webdriver.Chrome(options=build_chrome_options(), service=service)
+
+
+def create_driver(endpoint=None):
+    """Create a Chrome WebDriver for the given endpoint"""
+    if not is_local_endpoint(endpoint):
+        return _remote_chrome(endpoint, build_chrome_options())
+
+    cached = _read_json(DRIVER_CACHE_PATH)
+    try:
+        return _local_chrome()
+    except SessionNotCreatedException as e:
+        print(f"Chrome rejected the cached chromedriver ({e.msg}), resolving it again...")
+        invalidate_chromedriver(cached)
+        return _local_chrome()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["stop"]:
+        stop_persistent_service()
+    else:
+        print("Usage: python driver_factory.py stop")
@@ -0,0 +1,363 @@
+"""
+Page objects shared by the Selenium scripts
+
+Each screen of the app is defined once here. Elements are LazyElements:
+- located on first use, not when the page object is created
+- searched for inside a scoped container (the page's <main>, or a card),
+  not the whole document
+- cached after the first lookup and located again automatically when the
+  cached handle goes stale or stops being interactable
+
+Popups and the processing overlay can be rendered outside <main> (portals),
+so those are searched for from the document root.
+
+selenium.webdriver is imported when a page object is first created, not at
+import time, so importing the scripts stays cheap (see driver_factory.py).
+"""
+
+import re
+
+from selenium.common.exceptions import (ElementNotInteractableException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException)
+
+# <main> when the app renders one, otherwise <body>; later in document order wins
+MAIN_CONTAINER_XPATH = "(/html/body | //main)[last()]"
+
+# selenium.webdriver.common.by, imported by _load_by() when the first page object is created
+By = None
+
+
+def _load_by():
+    global By
+    if By is None:
+        from selenium.webdriver.common.by import By as by
+        By = by
+
+
+class LazyElement:
+    """Element handle located on first use within a scope and re-located when stale"""
+
+    def __init__(self, driver, *locators, scope=None, clickable=True, timeout=20):
+        self.driver = driver
+        self.locators = locators
+        self.scope = scope
+        self.clickable = clickable
+        self.timeout = timeout
+        self._element = None
+
+    def _root(self):
+        # the outer wait in get() bounds the search, so the scope is only polled once here
+        return self.scope.get(timeout=0) if self.scope else self.driver
+
+    def _locate(self, driver):
+        try:
+            root = self._root()
+        except TimeoutException:
+            return False
+        for locator in self.locators:
+            try:
+                element = root.find_element(*locator)
+            except NoSuchElementException:
+                continue
+            except StaleElementReferenceException:
+                if self.scope:
+                    self.scope.invalidate()
+                return False
+            if self.clickable and not (element.is_displayed() and element.is_enabled()):
+                continue
+            return element
+        return False
+
+    def get(self, timeout=None):
+        """The cached element, or wait up to timeout for it to be located"""
+        if self._element is None:
+            from selenium.webdriver.support.ui import WebDriverWait
+
+            self._element = WebDriverWait(
+                self.driver, self.timeout if timeout is None else timeout,
+                ignored_exceptions=[StaleElementReferenceException]).until(self._locate)
+        return self._element
+
+    def invalidate(self):
+        self._element = None
+
+    def exists(self, timeout=0):
+        try:
+            self.get(timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    def _perform(self, action, timeout=None):
+        try:
+            return action(self.get(timeout))
+        except (StaleElementReferenceException, ElementNotInteractableException):
+            self.invalidate()
+            return action(self.get(timeout))
+
+    def click(self, timeout=None):
+        self._perform(lambda element: element.click(), timeout)
+
+    def send_keys(self, *value):
+        self._perform(lambda element: element.send_keys(*value))
+
+
+class BasePage:
+    def __init__(self, driver, base_url, timeout=20):
+        _load_by()
+
+        self.driver = driver
+        self.base_url = base_url
+        self.timeout = timeout
+        self.container = LazyElement(driver, (By.XPATH, MAIN_CONTAINER_XPATH), clickable=False,
+                                     timeout=timeout)
+        self.home_link = LazyElement(
+            driver, (By.XPATH, "//*[contains(text(), 'Home') or contains(text(), 'home')]"),
+            timeout=timeout)
+
+    def element(self, *locators, clickable=True, scope=None):
+        """LazyElement searched for inside scope, the page's main container by default"""
+        return LazyElement(self.driver, *locators, scope=scope or self.container,
+                           clickable=clickable, timeout=self.timeout)
+
+    def open(self):
+        self.driver.get(self.base_url)
+
+    def go_to_home(self):
+        """Click the Home link; returns False if there is none (caller falls back to open())"""
+        try:
+            self.home_link.click()
+            return True
+        except TimeoutException:
+            return False
+
+
+class Popup:
+    """The app's OK popup (errors, 'template saved')"""
+
+    def __init__(self, driver):
+        _load_by()
+
+        self.ok_button = LazyElement(
+            driver, (By.XPATH, "//button[contains(text(), 'OK') or contains(text(), 'Ok') or contains(text(), 'ok')]"))
+
+    def dismiss(self, timeout=5):
+        """Click OK if a popup appears within timeout; returns whether one did"""
+        try:
+            self.ok_button.click(timeout)
+            return True
+        except TimeoutException:
+            return False
+
+
+class HomePage(BasePage):
+    def __init__(self, driver, base_url, timeout=20):
+        super().__init__(driver, base_url, timeout)
+        self.record_new_exercise_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Record New Exercise') or contains(text(), 'record new exercise') or contains(text(), 'New Exercise')]"),
+            (By.CSS_SELECTOR, "button[data-testid*='record'], button[class*='record']"))
+        self._exercise_cards = {}
+        self._compare_buttons = {}
+
+    def record_new_exercise(self):
+        self.record_new_exercise_button.click()
+
+    def exercise_card(self, name_variants):
+        """Nearest ancestor of the exercise's title that also holds its Compare button"""
+        key = tuple(name_variants)
+        if key not in self._exercise_cards:
+            title = " or ".join(f"contains(text(), '{name}')" for name in name_variants)
+            self._exercise_cards[key] = self.element(
+                (By.XPATH, f".//*[{title}]/ancestor-or-self::*[.//*[contains(text(), 'Compare')]][1]"),
+                clickable=False)
+        return self._exercise_cards[key]
+
+    def compare_button(self, name_variants):
+        """The Compare button inside the exercise's card"""
+        key = tuple(name_variants)
+        if key not in self._compare_buttons:
+            self._compare_buttons[key] = self.element(
+                (By.XPATH, ".//button[contains(text(), 'Compare')]"),
+                (By.XPATH, ".//*[contains(text(), 'Compare')]"),
+                scope=self.exercise_card(name_variants))
+        return self._compare_buttons[key]
+
+
+class RecordExercisePage(BasePage):
+    PROCESSING_XPATH = ("//*[contains(text(), 'Detecting pose') or "
+                        "contains(text(), 'detecting pose') or "
+                        "contains(text(), 'Detecting') or "
+                        "contains(text(), 'Processing') or "
+                        "contains(text(), 'processing') or "
+                        "contains(text(), 'landmarks')]")
+
+    def __init__(self, driver, base_url, timeout=20):
+        super().__init__(driver, base_url, timeout)
+        self.start_recording_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Start recording') or contains(text(), 'Start Recording') or contains(text(), 'Start')]"),
+            (By.CSS_SELECTOR, "button[data-testid*='start'], button[class*='start']"))
+        self.upload_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Upload Video') or contains(text(), 'Upload File') or contains(text(), 'upload')]"))
+        self.file_input = self.element((By.CSS_SELECTOR, "input[type='file']"), clickable=False)
+        self.analyze_button = self.element(
+            (By.XPATH, ".//button[contains(text(), 'Analyze and save exercise') or "
+                       "contains(text(), 'Analyze and Save Exercise') or "
+                       "contains(text(), 'Analyze') or "
+                       "contains(text(), 'analyze')]"),
+            (By.XPATH, ".//*[contains(@class, 'analyze') or contains(@id, 'analyze') or "
+                       "contains(text(), 'Save exercise')]"))
+        # the processing overlay may be portalled outside <main>
+        self.processing_started = LazyElement(
+            driver, (By.XPATH, "//*[contains(text(), 'Detecting pose') or contains(text(), 'detecting pose') or "
+                               "contains(text(), 'Detecting') or contains(text(), 'Processing')]"),
+            clickable=False, timeout=timeout)
+        self.play_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Play') or contains(text(), 'play')] | .//button[@aria-label='Play']"),
+            (By.CSS_SELECTOR, "button[class*='play'], [data-testid*='play'], .play-button"))
+        # most specific first; a bare 'Save' would also match 'Analyze and Save Exercise'
+        self.save_template_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Save Template') or contains(text(), 'Save template')]"),
+            (By.XPATH, ".//*[contains(text(), 'template')]"),
+            (By.XPATH, ".//button[contains(text(), 'Save') and not(contains(text(), 'Analyze'))]"))
+
+    def start_recording(self):
+        self.start_recording_button.click()
+
+    def open_upload(self):
+        """Reveal the file input and return it as a LazyElement, re-located if the page reloaded"""
+        self.upload_button.click()
+        self.file_input.invalidate()
+        self.file_input.get()
+        return self.file_input
+
+    def analyze(self):
+        self.analyze_button.click()
+
+    def wait_until_processing_started(self):
+        self.processing_started.invalidate()
+        self.processing_started.get()
+
+    def is_processing(self):
+        return bool(self.driver.find_elements(By.XPATH, self.PROCESSING_XPATH))
+
+    def play(self):
+        self.play_button.click()
+
+    def save_template(self):
+        self.save_template_button.click()
+
+
+class ComparisonResult:
+    """Score, rep count and feedback the app reports after comparing a video"""
+
+    SCORE_PATTERN = re.compile(
+        r"(?:score|accuracy|similarity)\D{0,20}?(\d+(?:\.\d+)?)\s*(%|/\s*100)?", re.IGNORECASE)
+    # "92.5 / 100" is a score, so it is removed before looking for "<n> reps"
+    OUT_OF_100_PATTERN = re.compile(r"\d+(?:\.\d+)?\s*/\s*100\b")
+    REPS_PATTERNS = [re.compile(r"(\d+)\s*(?:reps|repetitions)\b", re.IGNORECASE),
+                     re.compile(r"(?:reps|repetitions)\D{0,15}?(\d+)", re.IGNORECASE)]
+    NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+    FEEDBACK_LINES = 8
+
+    def __init__(self, score=None, reps=None, feedback=None, text=""):
+        self.score = score
+        self.reps = reps
+        self.feedback = feedback or []
+        self.text = text
+
+    @property
+    def found(self):
+        return self.score is not None or self.reps is not None
+
+    def differs_from(self, other):
+        """Whether this is a new result compared to an earlier read (None counts as nothing)"""
+        return other is None or self.text != other.text or self.to_dict() != other.to_dict()
+
+    @classmethod
+    def parse(cls, raw):
+        """Build from ComparePage.RESULT_SCRIPT output, preferring data-* attributes over text"""
+        text = raw.get("text") or ""
+
+        # attributes may carry units too, e.g. data-score="85%" or data-rep-count="3 reps"
+        score = cls._number(raw.get("score"), [cls.NUMBER_PATTERN])
+        if score is None:
+            score = cls._number(text, [cls.SCORE_PATTERN])
+
+        reps = cls._number(raw.get("reps"), [cls.NUMBER_PATTERN])
+        if reps is None:
+            reps = cls._number(cls.OUT_OF_100_PATTERN.sub(" ", text), cls.REPS_PATTERNS)
+
+        feedback = raw.get("feedback") or []
+        if not feedback:
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            for i, line in enumerate(lines):
+                if "feedback" in line.lower():
+                    feedback = lines[i + 1:i + 1 + cls.FEEDBACK_LINES]
+                    break
+
+        return cls(score, int(reps) if reps is not None else None, feedback, text)
+
+    @staticmethod
+    def _number(value, patterns):
+        """First group (or whole match) of the first pattern matching value, as a float"""
+        if value is None:
+            return None
+        for pattern in patterns:
+            match = pattern.search(str(value))
+            if match:
+                return float(match.group(1) if pattern.groups else match.group(0))
+        return None
+
+    def to_dict(self):
+        return {"score": self.score, "reps": self.reps, "feedback": self.feedback}
+
+
+class ComparePage(BasePage):
+    RESULT_SCRIPT = """
+const root = arguments[0];
+const attr = name => {
+    const element = root.querySelector(`[${name}]`);
+    return element ? element.getAttribute(name) : null;
+};
+const feedback = Array.from(root.querySelectorAll("[data-feedback]"))
+    .map(element => element.innerText.trim()).filter(Boolean);
+return { text: root.innerText, score: attr("data-score"), reps: attr("data-rep-count"), feedback: feedback };
+"""
+
+    def __init__(self, driver, base_url, timeout=20):
+        super().__init__(driver, base_url, timeout)
+        self.webcam_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'Record with webcam') or contains(text(), 'Webcam') or contains(text(), 'webcam')]"))
+        self.test_video_button = self.element(
+            (By.XPATH, ".//*[contains(text(), 'test with video') or contains(text(), 'Test with video') or contains(text(), 'video file')]"))
+        self.file_input = self.element((By.CSS_SELECTOR, "input[type='file']"), clickable=False)
+        # the result panel only, so targets and progress text elsewhere on the page are not
+        # read as a score or rep count; it may be portalled outside <main>
+        self.result_panel = LazyElement(
+            driver, (By.CSS_SELECTOR, "[data-comparison-result]"),
+            (By.CSS_SELECTOR, "[data-testid*='result']"),
+            (By.CSS_SELECTOR, "[class*='result']"),
+            (By.XPATH, "//*[self::h1 or self::h2 or self::h3 or self::h4]"
+                       "[contains(text(), 'Result') or contains(text(), 'result')]/.."),
+            clickable=False, timeout=timeout)
+
+    def record_with_webcam(self):
+        self.webcam_button.click()
+
+    def open_test_with_video(self):
+        """Reveal the file input and return it as a LazyElement, re-located if the page reloaded"""
+        self.test_video_button.click()
+        self.file_input.invalidate()
+        self.file_input.get()
+        return self.file_input
+
+    def comparison_result(self):
+        """What the result panel currently reports (empty until the app renders one)"""
+        try:
+            raw = self.driver.execute_script(self.RESULT_SCRIPT, self.result_panel.get(timeout=0))
+        except TimeoutException:
+            return ComparisonResult()
+        except StaleElementReferenceException:
+            self.result_panel.invalidate()
+            return ComparisonResult()
+        return ComparisonResult.parse(raw)
@@ -0,0 +1,258 @@
+"""
+Pose detection progress sampling and throughput curves
+
+ProgressSampler installs a small sampler in the page that records, every
+`interval_ms`, what the app exposes about its analysis progress:
+- currentTime / duration of the video being analyzed
+- progress text such as "Detecting pose... 42%" or "frame 120 / 300", kept up
+  to date by a MutationObserver as the app changes it
+- the value of a <progress> or role=progressbar element
+- landmark counts shown on the page ("1234 landmarks") or set as data-landmark-count
+
+The samples are turned into frames processed over time and a frames-per-second
+throughput curve. Each run uses a single signal, the most specific one any of
+its samples carries (frame counter, then landmarks, then percentage, then video
+time), so the curve never mixes units. Startup cost (time until the first frame
+is processed, e.g. model loading) is reported separately from the steady
+per-frame rate, so runs can be compared across videos and app builds:
+
+    python processing_progress.py ../.harness/progress/*.json
+"""
+
+from datetime import datetime
+import json
+import os
+import re
+import sys
+
+from result_cache import REPO_DIR
+
+PROGRESS_DIR = os.path.join(REPO_DIR, ".harness", "progress")
+
+INSTALL_SCRIPT = """
+const intervalMs = arguments[0];
+if (window.__harnessProgress) {
+    clearInterval(window.__harnessProgress.timer);
+    window.__harnessProgress.observer.disconnect();
+}
+const state = { start: performance.now(), samples: [], texts: new Map() };
+const textPattern = /(detecting|processing|analy[sz]|frame|landmark)/i;
+// only the nodes the app changes are inspected, the page is never walked
+const remember = node => {
+    const element = node.nodeType === Node.TEXT_NODE ? node.parentElement : node;
+    if (!element || element.nodeType !== Node.ELEMENT_NODE) { return; }
+    const text = (element.textContent || "").trim().slice(0, 200);
+    if (textPattern.test(text)) { state.texts.set(element, text); } else { state.texts.delete(element); }
+};
+state.observer = new MutationObserver(mutations => {
+    for (const mutation of mutations) {
+        if (mutation.type === "characterData") { remember(mutation.target); }
+        else { mutation.addedNodes.forEach(remember); }
+    }
+});
+state.observer.observe(document.body, { childList: true, characterData: true, subtree: true });
+state.timer = setInterval(() => {
+    const videos = Array.from(document.querySelectorAll("video"))
+        .filter(v => v.duration > 0 && isFinite(v.duration));
+    const video = videos.find(v => !v.paused) || videos[0];
+    const texts = [];
+    for (const [element, text] of state.texts) {
+        if (element.isConnected) { texts.push(text); } else { state.texts.delete(element); }
+    }
+    const bar = document.querySelector("progress[max], [role='progressbar'][aria-valuenow]");
+    if (bar) {
+        const value = bar.tagName === "PROGRESS" ? bar.value / bar.max
+            : (Number(bar.getAttribute("aria-valuenow")) - Number(bar.getAttribute("aria-valuemin") || 0))
+              / (Number(bar.getAttribute("aria-valuemax") || 100) - Number(bar.getAttribute("aria-valuemin") || 0));
+        if (isFinite(value)) { texts.push(`${(value * 100).toFixed(1)}%`); }
+    }
+    const tagged = document.querySelector("[data-landmark-count]");
+    state.samples.push({
+        t: (performance.now() - state.start) / 1000,
+        current_time: video ? video.currentTime : null,
+        duration: video ? video.duration : null,
+        text: texts.join(" | ").slice(0, 500),
+        landmark_count: tagged ? Number(tagged.getAttribute("data-landmark-count")) : null,
+    });
+}, intervalMs);
+window.__harnessProgress = state;
+"""
+
+COLLECT_SCRIPT = """
+const state = window.__harnessProgress;
+if (!state) { return null; }
+clearInterval(state.timer);
+state.observer.disconnect();
+window.__harnessProgress = null;
+return state.samples;
+"""
+
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+FRAME_PATTERN = re.compile(r"\bframe\s+(\d+)", re.IGNORECASE)
+LANDMARK_PATTERN = re.compile(r"(\d+)\s+landmarks", re.IGNORECASE)
+# the pose model reports 33 landmarks per detected frame
+LANDMARKS_PER_FRAME = 33
+
+# most specific first
+SIGNALS = ["frame", "landmarks", "percent", "video_time"]
+
+
+def frames_from_sample(sample, signal, fps):
+    """Frames processed at this sample according to one signal, or None if it lacks it"""
+    text = sample.get("text") or ""
+    if signal == "frame":
+        match = FRAME_PATTERN.search(text)
+        return int(match.group(1)) if match else None
+    if signal == "landmarks":
+        count = sample.get("landmark_count")
+        if count is None:
+            match = LANDMARK_PATTERN.search(text)
+            count = int(match.group(1)) if match else None
+        return count / LANDMARKS_PER_FRAME if count is not None else None
+    if signal == "percent":
+        match = PERCENT_PATTERN.search(text)
+        if match and sample.get("duration"):
+            return float(match.group(1)) / 100 * sample["duration"] * fps
+        return None
+    if signal == "video_time":
+        current_time = sample.get("current_time")
+        return current_time * fps if current_time is not None else None
+    raise ValueError(f"unknown progress signal {signal!r}")
+
+
+class ProgressRun:
+    """Progress samples of one analysis run and the throughput derived from them"""
+
+    def __init__(self, label, samples, fps=30, build=None, started_at=None):
+        self.label = label
+        self.samples = samples
+        self.fps = fps
+        self.build = build
+        self.started_at = started_at or datetime.now().isoformat(timespec="seconds")
+
+    def signal(self):
+        """Most specific signal present in any sample, or None if there is none"""
+        for signal in SIGNALS:
+            if any(frames_from_sample(sample, signal, self.fps) is not None for sample in self.samples):
+                return signal
+        return None
+
+    def frames(self):
+        """(seconds, frames processed) points from the run's signal, skipping samples without it"""
+        signal = self.signal()
+        if signal is None:
+            return []
+        points = []
+        for sample in self.samples:
+            frames = frames_from_sample(sample, signal, self.fps)
+            if frames is not None:
+                points.append((sample["t"], frames))
+        return points
+
+    def throughput_curve(self, window=1.0):
+        """(seconds, frames per second) over sliding windows of `window` seconds"""
+        points = self.frames()
+        curve = []
+        start = 0
+        for end in range(1, len(points)):
+            while points[end][0] - points[start][0] > window and start < end - 1:
+                start += 1
+            elapsed = points[end][0] - points[start][0]
+            if elapsed > 0:
+                curve.append((points[end][0], (points[end][1] - points[start][1]) / elapsed))
+        return curve
+
+    def startup_seconds(self):
+        """Time until the first frame was processed, or None if none was"""
+        for t, frames in self.frames():
+            if frames > 0:
+                return t
+        return None
+
+    def steady_fps(self):
+        """Median throughput after startup"""
+        startup = self.startup_seconds()
+        if startup is None:
+            return None
+        rates = sorted(fps for t, fps in self.throughput_curve() if t > startup)
+        if not rates:
+            return None
+        return rates[len(rates) // 2]
+
+    def summary(self):
+        startup = self.startup_seconds()
+        steady = self.steady_fps()
+        points = self.frames()
+        return {
+            "label": self.label,
+            "build": self.build,
+            "signal": self.signal(),
+            "samples": len(self.samples),
+            "frames": points[-1][1] if points else None,
+            "elapsed_seconds": self.samples[-1]["t"] if self.samples else None,
+            "startup_seconds": round(startup, 2) if startup is not None else None,
+            "steady_fps": round(steady, 2) if steady is not None else None,
+        }
+
+    def to_dict(self):
+        return {"label": self.label, "build": self.build, "fps": self.fps,
+                "started_at": self.started_at, "samples": self.samples,
+                "throughput_curve": self.throughput_curve()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["label"], data["samples"], data.get("fps", 30), data.get("build"),
+                   data.get("started_at"))
+
+    def save(self, directory=PROGRESS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.started_at.replace(":", "").replace("-", "")
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.label)
+        path = os.path.join(directory, f"{safe_label}-{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+class ProgressSampler:
+    def __init__(self, driver, interval_ms=100, fps=30):
+        self.driver = driver
+        self.interval_ms = interval_ms
+        self.fps = fps
+        self.started_at = None
+
+    def start(self):
+        """Start sampling in the page; call right before the analysis is triggered"""
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.driver.execute_script(INSTALL_SCRIPT, self.interval_ms)
+
+    def stop(self, label, build=None):
+        """Stop sampling and return the run, or None if the sampler was lost (e.g. page reload)"""
+        samples = self.driver.execute_script(COLLECT_SCRIPT)
+        if not samples:
+            return None
+        return ProgressRun(label, samples, self.fps, build, self.started_at)
+
+
+def print_comparison(runs):
+    print(f"{'run':<40} {'build':<12} {'signal':<10} {'frames':>8} {'elapsed':>8} {'startup':>8} {'fps':>8}")
+    for run in runs:
+        s = run.summary()
+        print(f"{s['label'][:40]:<40} {(s['build'] or '-')[:12]:<12} {s['signal'] or '-':<10} "
+              f"{_fmt(s['frames'])} {_fmt(s['elapsed_seconds'])} "
+              f"{_fmt(s['startup_seconds'])} {_fmt(s['steady_fps'])}")
+
+
+def _fmt(value):
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths and os.path.isdir(PROGRESS_DIR):
+        paths = sorted(os.path.join(PROGRESS_DIR, name) for name in os.listdir(PROGRESS_DIR))
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            runs.append(ProgressRun.from_dict(json.load(f)))
+    print_comparison(runs)
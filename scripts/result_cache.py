@@ -0,0 +1,169 @@
+"""
+Content-addressed cache of scenario results
+
+A scenario's outcome and metrics are stored under a key built from:
+- the SHA-256 of every video file it uploads
+- the scenario definition (source of its test class, the step method it runs
+  and the page objects in pages.py)
+- the app build fingerprint (hash of the JS bundles the page loads)
+
+If any of these change the key changes, so a hit means the same inputs already
+produced this answer. Only passing outcomes are stored: a failure may come from
+the environment (no browser, app not running) rather than the inputs, so it is
+always re-run. Entries older than max_age are dropped, and the oldest entries
+are evicted once the cache grows past max_bytes.
+"""
+
+from urllib.parse import urljoin, urlsplit
+from urllib.request import urlopen
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_VIDEOS_DIR = os.path.join(REPO_DIR, "test-videos")
+DEFAULT_CACHE_DIR = os.path.join(REPO_DIR, ".harness", "result-cache")
+# selectors live in the page objects, so they are part of every scenario's definition
+PAGE_OBJECTS_PATH = os.path.join(REPO_DIR, "scripts", "pages.py")
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+SCRIPT_SRC_PATTERN = re.compile(r"<script[^>]+src=[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+_file_digests = {}
+_build_fingerprints = {}
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, memoized on (path, size, mtime) so large videos are read once"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+
+def scenario_fingerprint(test_class, method_name):
+    """Hash of the test class and page object sources, so edited steps or selectors invalidate the cache"""
+    digest = hashlib.sha256(f"{method_name}\n{inspect.getsource(test_class)}".encode("utf-8"))
+    with open(PAGE_OBJECTS_PATH, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def app_build_fingerprint(base_url, timeout=10):
+    """Hash of the JS bundles the page loads, or None if the app is unreachable or loads none.
+    The HTML itself is left out: dev and server-rendered pages differ on every request
+    (timestamps, ?v= cache busters, rendered data), which would change the key every run."""
+    if base_url in _build_fingerprints:
+        return _build_fingerprints[base_url]
+
+    try:
+        with urlopen(base_url, timeout=timeout) as response:
+            html = response.read().decode("utf-8", "replace")
+        # bundle path without its query string -> URL to fetch it from
+        bundles = {}
+        for src in SCRIPT_SRC_PATTERN.findall(html):
+            url = urljoin(base_url, src)
+            bundles.setdefault(urlsplit(url).path, url)
+        fingerprint = None
+        if bundles:
+            digest = hashlib.sha256()
+            for path in sorted(bundles):
+                with urlopen(bundles[path], timeout=timeout) as response:
+                    digest.update(f"{path}\n".encode("utf-8"))
+                    digest.update(response.read())
+            fingerprint = digest.hexdigest()
+        else:
+            print(f"No JS bundles found at {base_url}, not caching results")
+    except OSError as e:
+        print(f"Could not fingerprint app build at {base_url}: {e}")
+        fingerprint = None
+
+    _build_fingerprints[base_url] = fingerprint
+    return fingerprint
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def make_key(self, scenario_name, test_class, method_name, video_files, base_url):
+        """Cache key for a scenario, or None if the app build cannot be fingerprinted"""
+        build = app_build_fingerprint(base_url)
+        if build is None:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(f"scenario:{scenario_name}\n".encode("utf-8"))
+        digest.update(f"definition:{scenario_fingerprint(test_class, method_name)}\n".encode("utf-8"))
+        digest.update(f"build:{build}\n".encode("utf-8"))
+        for filename in video_files:
+            video_hash = file_digest(os.path.join(TEST_VIDEOS_DIR, filename)) or "missing"
+            digest.update(f"video:{filename}:{video_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Cached passing entry for key, or None on a miss, an expired or a failed entry"""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("passed") else None
+
+    def put(self, key, entry):
+        """Store a passing entry; failed entries are not cached"""
+        if key is None or not entry.get("passed"):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entry = dict(entry, cached_at=time.time())
+        with open(self._path(key), "w") as f:
+            json.dump(entry, f, indent=2, sort_keys=True)
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until the cache fits in max_bytes"""
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,415 @@
+"""
+Sharded runner - spread the Selenium scenarios across several WebDriver endpoints
+Website: localhost:3000
+
+Endpoints are "local" (launch chromedriver here) or WebDriver server URLs,
+for example chromedrivers started with `chromedriver --port=9515` or a local
+Selenium Grid hub. One worker thread drives each endpoint.
+
+Scheduling:
+- Scenarios are weighted by the durations of their recent passing runs
+  (durations.json) and dealt out longest-first, so slow pose-detection
+  scenarios start first
+- Each endpoint owns a queue; an idle endpoint steals the heaviest pending
+  scenario from the endpoint with the most remaining work
+- If an endpoint cannot start or loses its session, it is retired and its
+  scenarios (including the one in flight) are moved to the remaining endpoints.
+  A scenario is moved at most MAX_REQUEUES times; after that it is failed
+  instead, since it breaks every endpoint it runs on
+- A scenario listed in SCENARIO_DEPENDENCIES is only dealt once the scenarios
+  it depends on have passed in this run, and fails without running if one of
+  them failed; dependencies that were not selected are assumed to have run before
+
+Passing results are cached by result_cache.ResultCache; a scenario whose
+videos, definition and app build are unchanged since it last passed is
+reported from the cache without running. Failed scenarios always re-run.
+Pass --force to re-run everything.
+
+Usage:
+    python sharded_runner.py --endpoint http://localhost:9515 --endpoint http://localhost:9516
+    python sharded_runner.py --endpoint local --scenario part1 --scenario part2
+    python sharded_runner.py --force
+"""
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from collections import deque
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+from test_part1_record_and_save import ExerciseRecordingPart1
+from test_part2_compare_exercise import ExerciseComparisonPart2
+from test_exercise_recording import ExerciseRecordingTest
+from result_cache import ResultCache
+from video_upload import KNEE_EXTENSION_VIDEO
+
+# scenario name -> (test class, method running the steps on an initialized driver, uploaded videos)
+SCENARIOS = {
+    "part1": (ExerciseRecordingPart1, "run_part1_steps", ["Untitled.mp4"]),
+    "part2": (ExerciseComparisonPart2, "run_part2_steps", [KNEE_EXTENSION_VIDEO]),
+    "complete": (ExerciseRecordingTest, "run_complete_steps",
+                 ["Untitled.mp4", KNEE_EXTENSION_VIDEO]),
+}
+
+# scenario name -> scenarios that must pass first; part2 compares against the
+# template part1 saves. complete records and saves its own template first.
+SCENARIO_DEPENDENCIES = {
+    "part2": ["part1"],
+}
+
+HARNESS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".harness")
+DEFAULT_HISTORY_PATH = os.path.join(HARNESS_DIR, "durations.json")
+DEFAULT_WEIGHT = 60.0
+HISTORY_SIZE = 5
+MAX_REQUEUES = 1
+
+
+class EndpointFailure(Exception):
+    """The endpoint itself is unusable (could not start or lost its session)"""
+
+
+# raised by webdriver.Remote when the WebDriver server cannot be reached
+CONNECTION_ERRORS = (MaxRetryError, NewConnectionError)
+
+
+class DurationHistory:
+    """Recent run durations per scenario, persisted as JSON"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.durations = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.durations = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read duration history {path}: {e}, starting fresh")
+
+    def weight(self, name):
+        """Mean of the recent durations, or the mean over all scenarios if unseen"""
+        runs = self.durations.get(name)
+        if runs:
+            return sum(runs) / len(runs)
+        known = [sum(r) / len(r) for r in self.durations.values() if r]
+        return sum(known) / len(known) if known else DEFAULT_WEIGHT
+
+    def record(self, name, seconds):
+        with self.lock:
+            runs = self.durations.setdefault(name, [])
+            runs.append(round(seconds, 2))
+            del runs[:-HISTORY_SIZE]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+
+
+class WorkStealingScheduler:
+    """Per-endpoint scenario queues with longest-first dealing and work stealing"""
+
+    def __init__(self, endpoints, scenario_names, history, dependencies=None):
+        self.history = history
+        self.queues = {endpoint: deque() for endpoint in endpoints}
+        self.in_flight = 0
+        self.orphaned = []
+        self.passed = set()
+        # scenario -> selected dependencies that have not passed yet
+        self.waiting = {}
+        # scenario -> reason it was not run
+        self.skipped = {}
+        # scenario -> times it was moved off a failed endpoint
+        self.requeues = {}
+        self.condition = threading.Condition()
+
+        ready = []
+        for name in scenario_names:
+            pending = {dep for dep in (dependencies or {}).get(name, ()) if dep in scenario_names}
+            if pending:
+                self.waiting[name] = pending
+            else:
+                ready.append(name)
+        self._deal(ready)
+
+    def _remaining(self, endpoint):
+        return sum(self.history.weight(name) for name in self.queues[endpoint])
+
+    def _deal(self, names):
+        """Longest-processing-time-first assignment onto the least loaded queue"""
+        for name in sorted(names, key=self.history.weight, reverse=True):
+            target = min(self.queues, key=self._remaining)
+            self.queues[target].append(name)
+        # keep each queue heaviest-first after merging into existing work
+        for endpoint, queue in self.queues.items():
+            self.queues[endpoint] = deque(sorted(queue, key=self.history.weight, reverse=True))
+
+    def next_for(self, endpoint):
+        """Next scenario for this endpoint, stealing if its own queue is empty.
+        Blocks while other endpoints still have work in flight that may be requeued.
+        Returns None when everything is done."""
+        with self.condition:
+            while True:
+                if endpoint not in self.queues:
+                    return None
+                if self.queues[endpoint]:
+                    self.in_flight += 1
+                    return self.queues[endpoint].popleft()
+
+                victims = [ep for ep in self.queues if ep != endpoint and self.queues[ep]]
+                if victims:
+                    victim = max(victims, key=self._remaining)
+                    name = self.queues[victim].popleft()
+                    print(f"[{endpoint}] stole '{name}' from {victim}")
+                    self.in_flight += 1
+                    return name
+
+                if self.in_flight == 0:
+                    return None
+                self.condition.wait()
+
+    def _skip_dependents(self, name):
+        for dependent, pending in list(self.waiting.items()):
+            if name in pending and dependent in self.waiting:
+                del self.waiting[dependent]
+                self.skipped[dependent] = f"dependency '{name}' did not pass"
+                self._skip_dependents(dependent)
+
+    def complete(self, name, passed):
+        """Record a finished scenario and release or skip the scenarios waiting on it"""
+        with self.condition:
+            self.in_flight -= 1
+            if passed:
+                self.passed.add(name)
+                released = []
+                for dependent, pending in list(self.waiting.items()):
+                    pending.discard(name)
+                    if not pending:
+                        del self.waiting[dependent]
+                        released.append(dependent)
+                if released and self.queues:
+                    self._deal(released)
+                else:
+                    self.orphaned.extend(released)
+            else:
+                self._skip_dependents(name)
+            self.condition.notify_all()
+
+    def fail_endpoint(self, endpoint, in_flight_name):
+        """Retire an endpoint and move its scenarios to the remaining endpoints.
+        Returns False and retires nothing if in_flight_name was already moved MAX_REQUEUES
+        times; the caller then fails it through complete()."""
+        with self.condition:
+            if self.requeues.get(in_flight_name, 0) >= MAX_REQUEUES:
+                return False
+            self.requeues[in_flight_name] = self.requeues.get(in_flight_name, 0) + 1
+            self.in_flight -= 1
+            pending = list(self.queues.pop(endpoint, ())) + [in_flight_name]
+            if self.queues:
+                print(f"Endpoint {endpoint} failed, moving {len(pending)} scenario(s) to "
+                      f"{len(self.queues)} remaining endpoint(s)")
+                self._deal(pending)
+            else:
+                print(f"Endpoint {endpoint} failed and no endpoints remain")
+                self.orphaned.extend(pending)
+            self.condition.notify_all()
+            return True
+
+
+class ScenarioResult:
+    def __init__(self, name, endpoint, passed, duration, error=None, cached=False, metrics=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.passed = passed
+        self.duration = duration
+        self.error = error
+        self.cached = cached
+        self.metrics = metrics or {}
+
+    def to_cache_entry(self):
+        return {"passed": self.passed, "duration": self.duration, "error": self.error,
+                "metrics": self.metrics}
+
+    @classmethod
+    def from_cache_entry(cls, name, entry):
+        return cls(name, None, entry["passed"], entry["duration"], entry.get("error"), cached=True,
+                   metrics=entry.get("metrics"))
+
+
+def collect_metrics(test):
+    """Metrics gathered by the test instance while it ran"""
+    metrics = {}
+    if test.uploader and test.uploader.timings:
+        metrics["upload_seconds"] = round(sum(t.total_seconds for t in test.uploader.timings), 2)
+    progress_run = getattr(test, "progress_run", None)
+    if progress_run is not None:
+        summary = progress_run.summary()
+        metrics["startup_seconds"] = summary["startup_seconds"]
+        metrics["steady_fps"] = summary["steady_fps"]
+    return metrics
+
+
+def run_scenario(name, endpoint, base_url):
+    """Run one scenario on one endpoint; raises EndpointFailure if the endpoint is at fault"""
+    test_class, method_name, _ = SCENARIOS[name]
+    test = test_class(base_url=base_url, endpoint=endpoint)
+    start_time = time.time()
+    try:
+        try:
+            test.setup_driver()
+        except (WebDriverException, OSError) + CONNECTION_ERRORS as e:
+            raise EndpointFailure(f"could not start a session: {e}") from e
+
+        try:
+            getattr(test, method_name)()
+        # the scenario's own errors (e.g. a missing fixture) must not retire the endpoint
+        except (InvalidSessionIdException,) + CONNECTION_ERRORS as e:
+            raise EndpointFailure(f"lost the session: {e}") from e
+        except Exception as e:
+            traceback.print_exc()
+            return ScenarioResult(name, endpoint, False, time.time() - start_time, str(e),
+                                  metrics=collect_metrics(test))
+
+        return ScenarioResult(name, endpoint, True, time.time() - start_time,
+                              metrics=collect_metrics(test))
+    finally:
+        if test.driver:
+            try:
+                test.driver.quit()
+            except Exception:
+                pass
+
+
+class ShardedRunner:
+    def __init__(self, endpoints, scenario_names, base_url="http://localhost:3000",
+                 history_path=DEFAULT_HISTORY_PATH, cache=None, force=False):
+        self.endpoints = endpoints
+        self.base_url = base_url
+        self.history = DurationHistory(history_path)
+        self.cache = cache
+        self.force = force
+        self.scheduler = WorkStealingScheduler(endpoints, scenario_names, self.history,
+                                               SCENARIO_DEPENDENCIES)
+        self.results = []
+        self.results_lock = threading.Lock()
+
+    def _cache_key(self, name):
+        if self.cache is None:
+            return None
+        test_class, method_name, video_files = SCENARIOS[name]
+        return self.cache.make_key(name, test_class, method_name, video_files, self.base_url)
+
+    def _run_one(self, endpoint, name):
+        """Run (or replay from the cache) one scenario; raises EndpointFailure"""
+        key = self._cache_key(name)
+        entry = None
+        if self.cache and not self.force:
+            entry = self.cache.get(key)
+        if entry is not None:
+            print(f"[{endpoint}] '{name}' unchanged since last run, using cached result")
+            return ScenarioResult.from_cache_entry(name, entry)
+
+        print(f"[{endpoint}] running '{name}'")
+        result = run_scenario(name, endpoint, self.base_url)
+        # a quick failure (e.g. app down) says nothing about how long the scenario takes
+        if result.passed:
+            self.history.record(name, result.duration)
+        if self.cache:
+            self.cache.put(key, result.to_cache_entry())
+        print(f"[{endpoint}] '{name}' {'passed' if result.passed else 'failed'} "
+              f"in {result.duration:.1f}s")
+        return result
+
+    def _worker(self, endpoint):
+        while True:
+            name = self.scheduler.next_for(endpoint)
+            if name is None:
+                return
+
+            # the scheduler must hear back about every scenario it handed out,
+            # otherwise the other workers wait for it forever
+            try:
+                result = self._run_one(endpoint, name)
+            except EndpointFailure as e:
+                print(f"[{endpoint}] endpoint failure while running '{name}': {e}")
+                if self.scheduler.fail_endpoint(endpoint, name):
+                    return
+                print(f"[{endpoint}] '{name}' already broke {MAX_REQUEUES} other endpoint(s), failing it")
+                result = ScenarioResult(name, endpoint, False, 0.0, str(e))
+            except Exception as e:
+                traceback.print_exc()
+                result = ScenarioResult(name, endpoint, False, 0.0, f"harness error: {e}")
+
+            with self.results_lock:
+                self.results.append(result)
+            self.scheduler.complete(name, result.passed)
+
+    def run(self):
+        scheduled = sum(len(q) for q in self.scheduler.queues.values()) + len(self.scheduler.waiting)
+        print("=" * 60)
+        print(f"Running {scheduled} scenario(s) "
+              f"on {len(self.endpoints)} endpoint(s)")
+        print("=" * 60)
+
+        workers = [threading.Thread(target=self._worker, args=(endpoint,), daemon=True)
+                   for endpoint in self.endpoints]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        for name in self.scheduler.orphaned:
+            self.results.append(ScenarioResult(name, None, False, 0.0, "no endpoints left"))
+        for name, reason in self.scheduler.skipped.items():
+            self.results.append(ScenarioResult(name, None, False, 0.0, reason))
+        # still waiting only if a dependency never finished (its endpoints all failed)
+        for name, pending in self.scheduler.waiting.items():
+            self.results.append(ScenarioResult(
+                name, None, False, 0.0, f"dependency {', '.join(sorted(pending))} did not run"))
+
+        self.history.save()
+        self.print_summary()
+        return all(result.passed for result in self.results)
+
+    def print_summary(self):
+        print("=" * 60)
+        for result in sorted(self.results, key=lambda r: r.name):
+            status = "PASS" if result.passed else "FAIL"
+            line = f"{status}  {result.name:<10} {result.duration:7.1f}s  "
+            line += "(cached)" if result.cached else str(result.endpoint)
+            if "upload_seconds" in result.metrics:
+                line += f"  upload {result.metrics['upload_seconds']:.1f}s"
+            if result.metrics.get("steady_fps") is not None:
+                line += f"  pose {result.metrics['steady_fps']:.1f} fps"
+            if result.error:
+                line += f"  ({result.error})"
+            print(line)
+        print("=" * 60)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run Selenium scenarios across WebDriver endpoints")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="'local' or a WebDriver server URL; repeat for more endpoints")
+    parser.add_argument("--scenario", action="append", dest="scenarios", choices=sorted(SCENARIOS),
+                        help="scenario to run; repeat for more (default: all)")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH,
+                        help="path of the scenario duration history")
+    parser.add_argument("--force", action="store_true",
+                        help="re-run scenarios even if a cached result matches")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the result cache")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    runner = ShardedRunner(args.endpoints or ["local"], args.scenarios or sorted(SCENARIOS),
+                           base_url=args.base_url, history_path=args.history,
+                           cache=None if args.no_cache else ResultCache(), force=args.force)
+    sys.exit(0 if runner.run() else 1)
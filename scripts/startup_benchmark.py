@@ -0,0 +1,96 @@
+"""
+Startup benchmark - time from script launch to the first driver.get(base_url)
+
+Each run launches a fresh Python process that does what test_part1_record_and_save.py
+does before its first page load (import the script, create the driver, load the
+home page) and reports when each phase finished, measured from the moment the
+parent launched it.
+
+Usage:
+    python startup_benchmark.py                 # warm: cached chromedriver, persistent service
+    python startup_benchmark.py --cold          # stop the service and drop the driver cache first
+    python startup_benchmark.py --private       # private chromedriver per session
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ["interpreter", "imports", "driver", "first_get"]
+
+
+def child(launched_at, base_url):
+    marks = {"interpreter": time.time() - launched_at}
+
+    from test_part1_record_and_save import ExerciseRecordingPart1
+    marks["imports"] = time.time() - launched_at
+
+    test = ExerciseRecordingPart1(base_url=base_url)
+    test.setup_driver()
+    marks["driver"] = time.time() - launched_at
+
+    test.driver.get(base_url)
+    marks["first_get"] = time.time() - launched_at
+
+    test.driver.quit()
+    print(json.dumps(marks))
+
+
+def reset_cold_start():
+    from driver_factory import DRIVER_CACHE_PATH, stop_persistent_service
+
+    stop_persistent_service()
+    if os.path.exists(DRIVER_CACHE_PATH):
+        os.remove(DRIVER_CACHE_PATH)
+
+
+def run_once(base_url, private):
+    env = dict(os.environ)
+    if private:
+        env["HARNESS_PERSISTENT_DRIVER"] = "0"
+    launched_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(launched_at), "--base-url", base_url],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise RuntimeError(f"benchmark run failed:\n{completed.stdout}\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time from script launch to the first page load")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--cold", action="store_true",
+                        help="stop the persistent chromedriver and drop the driver cache before each run")
+    parser.add_argument("--private", action="store_true",
+                        help="launch a private chromedriver per session instead of the persistent one")
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        child(args.child, args.base_url)
+        return
+
+    results = []
+    for run in range(args.runs):
+        if args.cold:
+            reset_cold_start()
+        marks = run_once(args.base_url, args.private)
+        results.append(marks)
+        print(f"Run {run + 1}: " + ", ".join(f"{phase} {marks[phase]:.2f}s" for phase in PHASES))
+
+    print("=" * 60)
+    mode = "cold" if args.cold else "warm"
+    print(f"Median over {args.runs} {mode} run(s){' (private chromedriver)' if args.private else ''}:")
+    for phase in PHASES:
+        print(f"  {phase:<12} {statistics.median(r[phase] for r in results):.2f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
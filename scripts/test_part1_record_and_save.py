@@ -12,104 +12,77 @@ This script covers:
 - Handle popup
 - Click play
 - Save template for comparison
+
+Results are cached (see result_cache.py): re-running against the same app build
+and the same Untitled.mp4 reports the cached outcome. Pass --force to re-run.
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 import time
-import os
+import sys
+
+from driver_factory import create_driver
+from pages import HomePage, Popup, RecordExercisePage
+from result_cache import ResultCache, app_build_fingerprint
+from video_upload import VideoUploader
+from processing_progress import ProgressSampler
 
 class ExerciseRecordingPart1:
-    def __init__(self, base_url="http://localhost:3000"):
+    def __init__(self, base_url="http://localhost:3000", endpoint=None):
         self.base_url = base_url
+        self.endpoint = endpoint
         self.driver = None
-        self.wait = None
+        self.home_page = None
+        self.record_page = None
+        self.popup = None
+        self.uploader = None
+        self.progress_sampler = None
+        self.progress_run = None
+        self.current_video = None
         
     def setup_driver(self):
         """Initialize the Chrome WebDriver"""
-        options = webdriver.ChromeOptions()
-        options.add_argument('--use-fake-ui-for-media-stream')
-        options.add_argument('--use-fake-device-for-media-stream')
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(self.endpoint)
         self.driver.maximize_window()
-        self.wait = WebDriverWait(self.driver, 20)
+        self.home_page = HomePage(self.driver, self.base_url)
+        self.record_page = RecordExercisePage(self.driver, self.base_url)
+        self.popup = Popup(self.driver)
+        self.uploader = VideoUploader(self.driver, self.endpoint)
+        self.progress_sampler = ProgressSampler(self.driver)
         
     def navigate_to_home(self):
         """Navigate to the home page"""
         print("Navigating to home page...")
-        self.driver.get(self.base_url)
+        self.home_page.open()
         time.sleep(2)
         
     def click_record_new_exercise(self):
         """Click on 'Record New Exercise' button"""
         print("Clicking 'Record New Exercise'...")
         try:
-            record_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Record New Exercise') or contains(text(), 'record new exercise') or contains(text(), 'New Exercise')]"))
-            )
-            record_button.click()
+            self.home_page.record_new_exercise()
             time.sleep(2)
         except TimeoutException:
-            try:
-                record_button = self.driver.find_element(By.CSS_SELECTOR, "button[data-testid*='record'], button[class*='record']")
-                record_button.click()
-                time.sleep(2)
-            except NoSuchElementException:
-                print("Could not find 'Record New Exercise' button")
-                raise
+            print("Could not find 'Record New Exercise' button")
+            raise
                 
     def start_recording(self):
         """Click on 'Start recording' button"""
         print("Clicking 'Start recording'...")
         try:
-            start_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Start recording') or contains(text(), 'Start Recording') or contains(text(), 'Start')]"))
-            )
-            start_button.click()
+            self.record_page.start_recording()
             time.sleep(2)
         except TimeoutException:
-            try:
-                start_button = self.driver.find_element(By.CSS_SELECTOR, "button[data-testid*='start'], button[class*='start']")
-                start_button.click()
-                time.sleep(2)
-            except NoSuchElementException:
-                print("Could not find 'Start recording' button")
-                raise
+            print("Could not find 'Start recording' button")
+            raise
                 
     def upload_video_file(self, filename="Untitled.mp4"):
-        """Upload video file from Downloads folder"""
+        """Upload video file from the test-videos folder"""
         print(f"Uploading video file: {filename}...")
         try:
-            upload_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Upload Video') or contains(text(), 'Upload File') or contains(text(), 'upload')]"))
-            )
-            upload_button.click()
-            time.sleep(2)
-            
-            file_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-            )
-            
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            test_videos_folder = os.path.join(current_dir, "test-videos")
-            file_path = os.path.join(test_videos_folder, filename)
-            
-            if not os.path.exists(file_path):
-                print(f"Warning: File {file_path} does not exist in test-videos folder.")
-                print(f"Please ensure {filename} is in your test-videos folder: {test_videos_folder}")
-            else:
-                print(f"Found file at: {file_path}")
-            
-            file_input.send_keys(file_path)
-            time.sleep(3)
+            file_input = self.record_page.open_upload()
+            self.uploader.upload(file_input, filename)
+            self.current_video = filename
             print(f"File {filename} uploaded successfully from test-videos folder")
             
         except TimeoutException:
@@ -120,47 +93,22 @@ class ExerciseRecordingPart1:
         """Click on 'Analyze and save exercise' button and wait for pose detection"""
         print("Clicking 'Analyze and save exercise'...")
         try:
-            analyze_button = None
-            
-            try:
-                analyze_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, 
-                        "//button[contains(text(), 'Analyze and save exercise') or "
-                        "contains(text(), 'Analyze and Save Exercise') or "
-                        "contains(text(), 'Analyze') or "
-                        "contains(text(), 'analyze')]"))
-                )
-            except TimeoutException:
-                analyze_button = self.driver.find_element(By.XPATH, 
-                    "//*[contains(@class, 'analyze') or contains(@id, 'analyze') or "
-                    "contains(text(), 'Save exercise')]")
-            
-            if analyze_button:
-                analyze_button.click()
-                print("'Analyze and save exercise' button clicked")
-            else:
-                raise Exception("Could not find 'Analyze and save exercise' button")
+            self.progress_sampler.start()
+            self.record_page.analyze()
+            print("'Analyze and save exercise' button clicked")
             
             print("Waiting for 'Detecting pose' text...")
-            self.wait.until(
-                EC.presence_of_element_located((By.XPATH, 
-                    "//*[contains(text(), 'Detecting pose') or contains(text(), 'detecting pose') or "
-                    "contains(text(), 'Detecting') or contains(text(), 'Processing')]"))
-            )
+            self.record_page.wait_until_processing_started()
             print("'Detecting pose' text found - processing started")
             
             # Check for popup error and click OK if it appears
             try:
                 print("Checking for popup error during analysis...")
-                ok_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, 
-                        "//button[contains(text(), 'OK') or contains(text(), 'Ok') or contains(text(), 'ok')]"))
-                )
-                ok_button.click()
-                print("Popup error OK button clicked")
-                time.sleep(2)
-            except TimeoutException:
-                print("No popup error found during analysis, continuing...")
+                if self.popup.dismiss(timeout=5):
+                    print("Popup error OK button clicked")
+                    time.sleep(2)
+                else:
+                    print("No popup error found during analysis, continuing...")
             except Exception as e:
                 print(f"Error checking for popup: {str(e)}, continuing anyway...")
             
@@ -188,15 +136,7 @@ class ExerciseRecordingPart1:
         
         while time.time() - start_time < timeout:
             try:
-                processing_elements = self.driver.find_elements(By.XPATH, 
-                    "//*[contains(text(), 'Detecting pose') or "
-                    "contains(text(), 'detecting pose') or "
-                    "contains(text(), 'Detecting') or "
-                    "contains(text(), 'Processing') or "
-                    "contains(text(), 'processing') or "
-                    "contains(text(), 'landmarks')]")
-                
-                if not processing_elements:
+                if not self.record_page.is_processing():
                     print("Processing completed - 'Detecting pose' text has disappeared")
                     break
                 else:
@@ -211,21 +151,35 @@ class ExerciseRecordingPart1:
         if time.time() - start_time >= timeout:
             print(f"Warning: Processing timeout reached ({timeout}s)")
         
+        self.record_progress()
         time.sleep(2)
+
+    def record_progress(self):
+        """Collect the progress samples taken during analysis and save the throughput curve"""
+        try:
+            build = app_build_fingerprint(self.base_url)
+            self.progress_run = self.progress_sampler.stop(self.current_video or "analysis",
+                                                           build=build[:12] if build else None)
+        except Exception as e:
+            print(f"Could not collect processing progress: {e}")
+            return
+        if self.progress_run is None:
+            print("No processing progress samples were collected")
+            return
+        summary = self.progress_run.summary()
+        print(f"Processing progress: {summary['samples']} samples, "
+              f"startup {summary['startup_seconds']}s, steady {summary['steady_fps']} fps")
+        print(f"Progress curve saved to {self.progress_run.save()}")
         
     def handle_popup(self):
         """Handle popup if it appears and click OK - continues if no popup found"""
         print("Checking for popup...")
         try:
-            ok_button = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//button[contains(text(), 'OK') or contains(text(), 'Ok') or contains(text(), 'ok')]"))
-            )
-            ok_button.click()
-            print("Popup OK button clicked")
-            time.sleep(2)
-        except TimeoutException:
-            print("No popup found, continuing...")
+            if self.popup.dismiss():
+                print("Popup OK button clicked")
+                time.sleep(2)
+            else:
+                print("No popup found, continuing...")
         except Exception as e:
             print(f"Error while checking for popup: {str(e)}, continuing anyway...")
             pass
@@ -233,20 +187,11 @@ class ExerciseRecordingPart1:
     def go_to_home(self):
         """Navigate back to home"""
         print("Navigating to home...")
-        try:
-            # Try to find home button/link
-            home_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Home') or contains(text(), 'home')]"))
-            )
-            home_button.click()
-            time.sleep(2)
-            
-        except TimeoutException:
+        if not self.home_page.go_to_home():
             # Alternative: navigate directly to home URL
             print("Home button not found, navigating to base URL...")
-            self.driver.get(self.base_url)
-            time.sleep(2)
+            self.home_page.open()
+        time.sleep(2)
             
     def click_play(self):
         """Click on play button - DEPRECATED"""
@@ -257,40 +202,20 @@ class ExerciseRecordingPart1:
         """Save template for comparison, then click OK on popup and go to home"""
         print("Saving template for comparison...")
         try:
-            save_template_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Save Template') or contains(text(), 'Save') or contains(text(), 'template')]"))
-            )
-            save_template_button.click()
+            self.record_page.save_template()
             time.sleep(2)
             
             # Wait for and click OK on the "template has been saved" popup
             print("Waiting for 'template saved' popup...")
-            try:
-                ok_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, 
-                        "//button[contains(text(), 'OK') or contains(text(), 'Ok') or contains(text(), 'ok')]"))
-                )
-                ok_button.click()
+            if self.popup.dismiss(timeout=10):
                 print("Clicked OK on 'template saved' popup")
                 time.sleep(2)
-            except TimeoutException:
+            else:
                 print("No popup appeared after saving template, continuing...")
             
             # Navigate back to home
             print("Navigating to home after saving template...")
-            try:
-                home_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, 
-                        "//*[contains(text(), 'Home') or contains(text(), 'home')]"))
-                )
-                home_button.click()
-                print("Clicked Home button")
-                time.sleep(2)
-            except TimeoutException:
-                print("Home button not found, navigating to base URL...")
-                self.driver.get(self.base_url)
-                time.sleep(2)
+            self.go_to_home()
             
         except TimeoutException:
             print("Could not find 'Save template' button")
@@ -298,8 +223,42 @@ class ExerciseRecordingPart1:
     
     
 
-    def run_part1_test(self):
-        """Execute Part 1 test flow"""
+    def run_part1_steps(self):
+        """Execute the Part 1 steps against an already initialized driver"""
+        # Navigate to home
+        self.navigate_to_home()
+        
+        # Step 1: Record New Exercise
+        self.click_record_new_exercise()
+        
+        # Step 2: Start recording
+        self.start_recording()
+        
+        # Step 3: Upload Video File (Untitled.mp4)
+        self.upload_video_file("Untitled.mp4")
+        
+        # Step 4: Analyze and save exercise
+        self.analyze_and_save_exercise()
+        
+        # Step 5: Wait for processing to finish
+        self.wait_for_processing()
+        
+        # Step 6: Save template for comparison (includes clicking OK popup and going home)
+        self.save_template_for_comparison()
+
+    def run_part1_test(self, cache=None, force=False):
+        """Execute Part 1 test flow, reusing a cached result when the inputs are unchanged"""
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key("part1", ExerciseRecordingPart1, "run_part1_steps",
+                                       ["Untitled.mp4"], self.base_url)
+            entry = None if force else cache.get(cache_key)
+            if entry is not None:
+                print(f"Part 1 unchanged since last run: passed in {entry['duration']:.1f}s (cached)")
+                print("Run with --force to re-run anyway")
+                return
+
+        start_time = time.time()
         try:
             print("=" * 60)
             print("Starting Part 1: Record Exercise and Save Template")
@@ -308,30 +267,13 @@ class ExerciseRecordingPart1:
             # Setup
             self.setup_driver()
             
-            # Navigate to home
-            self.navigate_to_home()
-            
-            # Step 1: Record New Exercise
-            self.click_record_new_exercise()
-            
-            # Step 2: Start recording
-            self.start_recording()
-            
-            # Step 3: Upload Video File (Untitled.mp4)
-            self.upload_video_file("Untitled.mp4")
-            
-            # Step 4: Analyze and save exercise
-            self.analyze_and_save_exercise()
-            
-            # Step 5: Wait for processing to finish
-            self.wait_for_processing()
-            
-            # Step 6: Save template for comparison (includes clicking OK popup and going home)
-            self.save_template_for_comparison()
+            self.run_part1_steps()
             
             print("=" * 60)
             print("Part 1 completed successfully!")
             print("=" * 60)
+            if cache:
+                cache.put(cache_key, {"passed": True, "duration": time.time() - start_time, "error": None})
             
             # Keep browser open for inspection
             input("Press Enter to close the browser...")
@@ -355,4 +297,4 @@ class ExerciseRecordingPart1:
 if __name__ == "__main__":
     # Create test instance and run Part 1
     test = ExerciseRecordingPart1(base_url="http://localhost:3000")
-    test.run_part1_test()
+    test.run_part1_test(cache=ResultCache(), force="--force" in sys.argv)
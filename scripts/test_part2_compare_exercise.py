@@ -7,53 +7,60 @@ This script covers:
 - Go to home
 - Click on knee extension and compare
 - Record with webcam
-- Test with video file (Seated knee extension.mp4)
+- Test with video file (test-videos/Seated Knee Extension - PT Exercise _ OneStep Digital Physical Therapy.mp4)
+- Read the comparison result (score, reps, feedback), with --read-result;
+  the run fails if the app reports none
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException
+import sys
 import time
-import os
+
+from driver_factory import create_driver
+from pages import ComparePage, HomePage, Popup
+from video_upload import KNEE_EXTENSION_VIDEO, VideoUploader
 
 class ExerciseComparisonPart2:
-    def __init__(self, base_url="http://localhost:3000"):
+    def __init__(self, base_url="http://localhost:3000", endpoint=None):
         self.base_url = base_url
+        self.endpoint = endpoint
         self.driver = None
-        self.wait = None
+        self.home_page = None
+        self.compare_page = None
+        self.popup = None
+        self.uploader = None
+        self.result_before_upload = None
+        self.comparison = None
+        self.comparison_latency = None
         
     def setup_driver(self):
         """Initialize the Chrome WebDriver"""
-        options = webdriver.ChromeOptions()
-        options.add_argument('--use-fake-ui-for-media-stream')
-        options.add_argument('--use-fake-device-for-media-stream')
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(self.endpoint)
         self.driver.maximize_window()
-        self.wait = WebDriverWait(self.driver, 20)
+        self.create_pages()
+        self.uploader = VideoUploader(self.driver, self.endpoint)
+
+    def create_pages(self):
+        """Fresh page objects, with no element handles cached from an earlier page load"""
+        self.home_page = HomePage(self.driver, self.base_url)
+        self.compare_page = ComparePage(self.driver, self.base_url)
+        self.popup = Popup(self.driver)
         
     def navigate_to_home(self):
         """Navigate to the home page"""
         print("Navigating to home page...")
-        self.driver.get(self.base_url)
+        self.home_page.open()
         time.sleep(2)
         
     def handle_popup(self):
         """Handle popup if it appears and click OK - continues if no popup found"""
         print("Checking for popup...")
         try:
-            ok_button = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//button[contains(text(), 'OK') or contains(text(), 'Ok') or contains(text(), 'ok')]"))
-            )
-            ok_button.click()
-            print("Popup OK button clicked")
-            time.sleep(2)
-        except TimeoutException:
-            print("No popup found, continuing...")
+            if self.popup.dismiss():
+                print("Popup OK button clicked")
+                time.sleep(2)
+            else:
+                print("No popup found, continuing...")
         except Exception as e:
             print(f"Error while checking for popup: {str(e)}, continuing anyway...")
             pass
@@ -65,35 +72,19 @@ class ExerciseComparisonPart2:
         
     def go_to_home(self):
         print("Navigating to home...")
-        try:
-            home_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Home') or contains(text(), 'home')]"))
-            )
-            home_button.click()
-            time.sleep(2)
-            
-        except TimeoutException:
+        if not self.home_page.go_to_home():
             print("Home button not found, navigating to base URL...")
-            self.driver.get(self.base_url)
-            time.sleep(2)
+            self.home_page.open()
+        time.sleep(2)
             
     def click_knee_extension_compare(self):
         print("Looking for 'knee extension' and clicking compare...")
         try:
-            knee_extension = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, 
-                    "//*[contains(text(), 'knee extension') or contains(text(), 'Knee Extension')]"))
-            )
+            knee_extension = ("knee extension", "Knee Extension")
+            self.home_page.exercise_card(knee_extension).get()
             print("Found knee extension entry")
             
-            compare_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'knee extension') or contains(text(), 'Knee Extension')]//*[contains(text(), 'Compare')] | "
-                    "//*[contains(text(), 'knee extension') or contains(text(), 'Knee Extension')]//following::*[contains(text(), 'Compare')][1] | "
-                    "//*[contains(text(), 'knee extension') or contains(text(), 'Knee Extension')]//ancestor::*//button[contains(text(), 'Compare')]"))
-            )
-            compare_button.click()
+            self.home_page.compare_button(knee_extension).click()
             time.sleep(2)
             
         except TimeoutException:
@@ -104,62 +95,66 @@ class ExerciseComparisonPart2:
         """Click on record with webcam option"""
         print("Clicking 'Record with webcam'...")
         try:
-            webcam_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'Record with webcam') or contains(text(), 'Webcam') or contains(text(), 'webcam')]"))
-            )
-            webcam_button.click()
+            self.compare_page.record_with_webcam()
             time.sleep(2)
             
         except TimeoutException:
             print("Could not find 'Record with webcam' button")
             raise
             
-    def test_with_video_file(self, filename="Seated knee extension.mp4"):
+    def test_with_video_file(self, filename=KNEE_EXTENSION_VIDEO):
         print(f"Testing with video file: {filename}...")
         try:
-            test_video_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//*[contains(text(), 'test with video') or contains(text(), 'Test with video') or contains(text(), 'video file')]"))
-            )
-            test_video_button.click()
-            time.sleep(2)
-            
-            file_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-            )
-            
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            test_videos_folder = os.path.join(current_dir, "test-videos")
-            file_path = os.path.join(test_videos_folder, filename)
-            
-            if not os.path.exists(file_path):
-                print(f"Warning: File {file_path} does not exist in test-videos folder.")
-                print(f"Please ensure {filename} is in your test-videos folder: {test_videos_folder}")
-            else:
-                print(f"Found file at: {file_path}")
-            
-            file_input.send_keys(file_path)
-            time.sleep(3)
+            # whatever the result panel shows now is not this video's result
+            self.result_before_upload = self.compare_page.comparison_result()
+            file_input = self.compare_page.open_test_with_video()
+            self.uploader.upload(file_input, filename)
             print(f"File {filename} uploaded successfully from test-videos folder")
             
         except TimeoutException:
             print("Could not find 'Test with video' option or file input")
             raise
             
-    def run_part2_test(self):
+    def read_comparison_result(self, timeout=180):
+        """Wait for the app to report a comparison result that was not there before the upload,
+        and return it with its latency"""
+        print("Waiting for comparison result...")
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            try:
+                result = self.compare_page.comparison_result()
+                if result.found and result.differs_from(self.result_before_upload):
+                    latency = time.time() - start_time
+                    print(f"Comparison result after {latency:.1f}s: score {result.score}, "
+                          f"reps {result.reps}, {len(result.feedback)} feedback line(s)")
+                    return result, latency
+            except Exception as e:
+                print(f"Error reading comparison result: {e}")
+            time.sleep(0.5)
+        print(f"Warning: no comparison result within {timeout}s")
+        return None, None
+
+    def run_part2_steps(self, filename=KNEE_EXTENSION_VIDEO, read_result=False, result_timeout=180):
+        """Execute the Part 2 steps against an already initialized driver"""
+        self.navigate_to_home()
+        self.click_ok_after_save()
+        self.go_to_home()
+        self.click_knee_extension_compare()
+        self.record_with_webcam()
+        self.test_with_video_file(filename)
+        if read_result:
+            self.comparison, self.comparison_latency = self.read_comparison_result(result_timeout)
+            if self.comparison is None:
+                raise RuntimeError(f"no comparison result within {result_timeout}s")
+
+    def run_part2_test(self, read_result=False):
         try:
             print("=" * 60)
             print("Starting Part 2: Compare Exercise with Video")
             print("=" * 60)
             
             self.setup_driver()
-            self.navigate_to_home()
-            self.click_ok_after_save()
-            self.go_to_home()
-            self.click_knee_extension_compare()
-            self.record_with_webcam()
-            self.test_with_video_file("Seated knee extension.mp4")
+            self.run_part2_steps(read_result=read_result)
             
             print("=" * 60)
             print("Part 2 completed successfully!")
@@ -184,4 +179,4 @@ class ExerciseComparisonPart2:
 
 if __name__ == "__main__":
     test = ExerciseComparisonPart2(base_url="http://localhost:3000")
-    test.run_part2_test()
+    test.run_part2_test(read_result="--read-result" in sys.argv)
@@ -0,0 +1,179 @@
+"""
+Video upload fast path for the Selenium scripts
+
+`file_input.send_keys(path)` on a remote driver makes Selenium zip and base64
+encode the whole MP4 on every call. VideoUploader instead gets each fixture
+onto the browser host once, keyed by its SHA-256, and hands the file input a
+path that already exists there:
+
+- Browser on this machine (local driver, or a WebDriver server declared to
+  share this machine's files with shares_files / HARNESS_BROWSER_SHARES_FILES=1):
+  the fixture path is used directly, nothing is transferred. A server on
+  localhost is not assumed to qualify, it may be a Grid running in a container
+- Staging directory shared with the browser host (e.g. a mounted volume):
+  the fixture is copied to <staging>/<sha256><ext> once and reused across runs
+- Otherwise: the fixture is uploaded once per session and the remote path is
+  reused for every later upload of the same content
+
+Staging is timed separately from the file input, and the fixed post-upload
+sleep is replaced by waiting for the app to load the video's metadata.
+"""
+
+from selenium.common.exceptions import TimeoutException
+import base64
+import io
+import os
+import shutil
+import time
+import zipfile
+
+from driver_factory import is_local_endpoint
+from result_cache import TEST_VIDEOS_DIR, file_digest
+
+# fixture in test-videos the compare scenarios upload
+KNEE_EXTENSION_VIDEO = "Seated Knee Extension - PT Exercise _ OneStep Digital Physical Therapy.mp4"
+
+# currentSrc of every <video> on the page, taken before the file is selected
+VIDEO_SOURCES_SCRIPT = """
+return Array.from(document.querySelectorAll("video")).map(video => video.currentSrc);
+"""
+
+# True once the app has read the selected file: an <input type=file> holds a
+# file and a <video> whose source was not on the page before the upload
+# (arguments[0], from VIDEO_SOURCES_SCRIPT) has at least HAVE_METADATA with a
+# known duration. Reference videos and webcam streams (srcObject) are ignored.
+METADATA_LOADED_SCRIPT = """
+const before = new Set(arguments[0]);
+const hasFile = Array.from(document.querySelectorAll("input[type='file']"))
+    .some(input => input.files && input.files.length > 0);
+const hasMetadata = Array.from(document.querySelectorAll("video"))
+    .some(video => video.currentSrc && !video.srcObject && !before.has(video.currentSrc)
+        && video.readyState >= 1 && video.duration > 0 && isFinite(video.duration));
+return hasFile && hasMetadata;
+"""
+
+
+def fixture_path(filename):
+    """Path of a video in the repository's test-videos folder (absolute paths are kept)"""
+    if os.path.isabs(filename):
+        return filename
+    return os.path.join(TEST_VIDEOS_DIR, filename)
+
+
+def browser_on_this_host(endpoint, shares_files=None):
+    """Whether the browser behind the endpoint can read this machine's files"""
+    if is_local_endpoint(endpoint):
+        return True
+    if shares_files is None:
+        shares_files = os.environ.get("HARNESS_BROWSER_SHARES_FILES") == "1"
+    return shares_files
+
+
+class UploadTiming:
+    def __init__(self, filename, method, stage_seconds, input_seconds, metadata_seconds,
+                 metadata_loaded):
+        self.filename = filename
+        self.method = method
+        self.stage_seconds = stage_seconds
+        self.input_seconds = input_seconds
+        self.metadata_seconds = metadata_seconds
+        self.metadata_loaded = metadata_loaded
+
+    @property
+    def total_seconds(self):
+        return self.stage_seconds + self.input_seconds + self.metadata_seconds
+
+    def __str__(self):
+        return (f"{self.filename} via {self.method}: stage {self.stage_seconds:.2f}s, "
+                f"input {self.input_seconds:.2f}s, metadata {self.metadata_seconds:.2f}s"
+                f"{'' if self.metadata_loaded else ' (metadata not detected)'}")
+
+
+class VideoUploader:
+    def __init__(self, driver, endpoint=None, staging_dir=None, remote_staging_dir=None,
+                 metadata_timeout=15, shares_files=None):
+        self.driver = driver
+        self.endpoint = endpoint
+        self.shares_files = shares_files
+        self.staging_dir = staging_dir or os.environ.get("HARNESS_STAGING_DIR")
+        self.remote_staging_dir = (remote_staging_dir or os.environ.get("HARNESS_REMOTE_STAGING_DIR")
+                                   or self.staging_dir)
+        self.metadata_timeout = metadata_timeout
+        self.session_uploads = {}
+        self.timings = []
+
+    def stage(self, local_path):
+        """Make the file available on the browser host; returns (path there, method)"""
+        if browser_on_this_host(self.endpoint, self.shares_files):
+            return local_path, "local path"
+
+        digest = file_digest(local_path)
+        extension = os.path.splitext(local_path)[1]
+
+        if self.staging_dir:
+            staged = os.path.join(self.staging_dir, digest + extension)
+            if os.path.exists(staged):
+                method = "staged (reused)"
+            else:
+                os.makedirs(self.staging_dir, exist_ok=True)
+                partial = staged + ".partial"
+                shutil.copyfile(local_path, partial)
+                os.replace(partial, staged)
+                method = "staged (copied)"
+            return os.path.join(self.remote_staging_dir, digest + extension), method
+
+        if digest in self.session_uploads:
+            return self.session_uploads[digest], "session upload (reused)"
+
+        from selenium.webdriver.remote.command import Command
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            archive.write(local_path, digest + extension)
+        content = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        remote_path = self.driver.execute(Command.UPLOAD_FILE, {"file": content})["value"]
+        self.session_uploads[digest] = remote_path
+        return remote_path, "session upload"
+
+    def video_sources(self):
+        return self.driver.execute_script(VIDEO_SOURCES_SCRIPT) or []
+
+    def wait_for_metadata(self, previous_sources=()):
+        """Wait until the app has loaded the metadata of a video not in previous_sources"""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            WebDriverWait(self.driver, self.metadata_timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(METADATA_LOADED_SCRIPT, list(previous_sources)))
+            return True
+        except TimeoutException:
+            return False
+
+    def upload(self, file_input, filename):
+        """Send a test-videos fixture to a file input (a LazyElement, so a stale handle is
+        re-located) and wait for the app to read it"""
+        from selenium.webdriver.remote.file_detector import UselessFileDetector
+
+        local_path = fixture_path(filename)
+        if not os.path.exists(local_path):
+            raise FileNotFoundError(f"{filename} is not in the test-videos folder: {TEST_VIDEOS_DIR}")
+
+        previous_sources = self.video_sources()
+        start = time.time()
+        browser_path, method = self.stage(local_path)
+        staged = time.time()
+
+        # the file is already on the browser host, so stop Selenium re-uploading it
+        with self.driver.file_detector_context(UselessFileDetector):
+            file_input.send_keys(browser_path)
+        sent = time.time()
+
+        metadata_loaded = self.wait_for_metadata(previous_sources)
+        timing = UploadTiming(filename, method, staged - start, sent - staged,
+                              time.time() - sent, metadata_loaded)
+        self.timings.append(timing)
+        print(f"Upload timing: {timing}")
+        if not metadata_loaded:
+            print(f"Warning: app did not report metadata for {filename} "
+                  f"within {self.metadata_timeout}s, continuing...")
+        return timing
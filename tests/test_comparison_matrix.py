@@ -0,0 +1,41 @@
+import pytest
+
+from comparison_matrix import ComparisonMatrix, MatrixCell, REFERENCE, prepare_fixture
+from pages import ComparisonResult
+
+
+def cell(fidelity, throttling, score=None, reps=None, feedback=None, latency=1.0):
+    return MatrixCell(fidelity, throttling, ComparisonResult(score, reps, feedback), latency)
+
+
+def test_drift_against_reference():
+    reference = cell("full", "none", 90, 10, ["a", "b"])
+    drift = cell("720p", "none", 87.5, 9, ["a", "c"]).drift(reference)
+    assert drift == (2.5, 1, 2)
+
+
+def test_no_drift_without_a_reference_result():
+    assert cell("720p", "none", 90, 10).drift(None) is None
+    assert cell("720p", "none", 90, 10).drift(MatrixCell("full", "none")) is None
+
+
+def test_within_tolerance_needs_a_comparable_metric():
+    reference = cell("full", "none", score=90)
+    assert not cell("720p", "none", reps=3).within_tolerance(reference, 5, 0)
+    assert cell("720p", "none", score=88).within_tolerance(reference, 5, 0)
+    assert not cell("720p", "none", score=80).within_tolerance(reference, 5, 0)
+
+
+def test_cheapest_is_fastest_cell_within_tolerance():
+    matrix = ComparisonMatrix(score_tolerance=5, reps_tolerance=0)
+    matrix.cells = {
+        REFERENCE: cell(*REFERENCE, score=90, reps=10, latency=30),
+        ("720p", "none"): cell("720p", "none", score=89, reps=10, latency=20),
+        ("360p-10fps", "none"): cell("360p-10fps", "none", score=70, reps=10, latency=5),
+    }
+    assert (matrix.cheapest().fidelity, matrix.cheapest().throttling) == ("720p", "none")
+
+
+def test_missing_source_video_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        prepare_fixture(str(tmp_path / "missing.mp4"), "720p")
@@ -0,0 +1,114 @@
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from pages import ComparePage, ComparisonResult, RecordExercisePage
+
+
+class FakeElement:
+    def __init__(self, driver, locator):
+        self.driver = driver
+        self.locator = locator
+        self.generation = driver.generation
+        self.sent = []
+
+    def _check(self):
+        if self.generation != self.driver.generation:
+            raise StaleElementReferenceException("stale")
+
+    def find_element(self, by, value):
+        self._check()
+        return self.driver.find_element(by, value)
+
+    def is_displayed(self):
+        self._check()
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self._check()
+
+    def send_keys(self, *value):
+        self._check()
+        self.sent.append(value)
+
+
+class FakeDriver:
+    """Every locator matches; a page load makes all earlier handles stale"""
+
+    def __init__(self, missing=()):
+        self.generation = 0
+        self.missing = missing
+        self.found = []
+
+    def get(self, url):
+        self.generation += 1
+
+    def find_element(self, by, value):
+        if any(text in value for text in self.missing):
+            raise NoSuchElementException(value)
+        self.found.append(value)
+        return FakeElement(self, value)
+
+
+def test_file_input_survives_a_page_reload():
+    driver = FakeDriver()
+    page = ComparePage(driver, "http://app/")
+    page.open_test_with_video().send_keys("first.mp4")
+    driver.get("http://app/")
+    file_input = page.open_test_with_video()
+    file_input.send_keys("second.mp4")
+    assert file_input.get().sent == [("second.mp4",)]
+
+
+def test_cached_handle_is_relocated_when_stale():
+    driver = FakeDriver()
+    page = RecordExercisePage(driver, "http://app/")
+    file_input = page.open_upload()
+    driver.get("http://app/")
+    file_input.send_keys("video.mp4")
+    assert file_input.get().generation == driver.generation
+
+
+def test_save_template_prefers_the_template_button():
+    driver = FakeDriver()
+    page = RecordExercisePage(driver, "http://app/")
+    assert "Save Template" in page.save_template_button.get().locator
+
+
+def test_save_template_falls_back_to_save_but_not_analyze():
+    driver = FakeDriver(missing=("Save Template", "template"))
+    page = RecordExercisePage(driver, "http://app/")
+    locator = page.save_template_button.get().locator
+    assert "not(contains(text(), 'Analyze'))" in locator
+
+
+def parse(text="", **attributes):
+    return ComparisonResult.parse(dict(attributes, text=text))
+
+
+def test_result_text_is_parsed():
+    result = parse("Score: 82%\n5 reps\nFeedback\nKeep your back straight")
+    assert (result.score, result.reps) == (82.0, 5)
+    assert result.feedback == ["Keep your back straight"]
+
+
+def test_score_out_of_100_is_not_read_as_reps():
+    result = parse("Accuracy 92.5 / 100 Repetitions: 4")
+    assert (result.score, result.reps) == (92.5, 4)
+
+
+def test_attributes_with_units_are_parsed():
+    result = parse("", score="85%", reps="3 reps")
+    assert (result.score, result.reps) == (85.0, 3)
+
+
+def test_progress_text_is_not_a_result():
+    assert not parse("Matching template... 0%").found
+
+
+def test_result_differs_from_what_was_shown_before_upload():
+    before = parse("Score: 70%")
+    assert not parse("Score: 70%").differs_from(before)
+    assert parse("Score: 75%").differs_from(before)
+    assert parse("Score: 70%").differs_from(None)
@@ -0,0 +1,55 @@
+import pytest
+
+from processing_progress import LANDMARKS_PER_FRAME, ProgressRun, frames_from_sample
+
+
+def samples(texts, step=0.5, **extra):
+    return [dict({"t": i * step, "text": text}, **extra) for i, text in enumerate(texts)]
+
+
+def test_frame_counter_needs_the_word_frame():
+    assert frames_from_sample({"text": "Processing frame 120 / 300"}, "frame", 30) == 120
+    assert frames_from_sample({"text": "step 1 of 3"}, "frame", 30) is None
+
+
+def test_landmarks_are_converted_to_frames():
+    sample = {"text": f"{LANDMARKS_PER_FRAME * 10} landmarks"}
+    assert frames_from_sample(sample, "landmarks", 30) == 10
+    assert frames_from_sample({"landmark_count": LANDMARKS_PER_FRAME * 4}, "landmarks", 30) == 4
+
+
+def test_percent_uses_video_duration():
+    assert frames_from_sample({"text": "Detecting pose... 50%", "duration": 10}, "percent", 30) == 150
+
+
+def test_unknown_signal_is_rejected():
+    with pytest.raises(ValueError):
+        frames_from_sample({}, "bogus", 30)
+
+
+def test_run_uses_its_most_specific_signal_for_every_point():
+    run = ProgressRun("run", [
+        {"t": 0.0, "text": "Detecting pose", "current_time": 0.5},
+        {"t": 1.0, "text": "frame 30", "current_time": 1.0},
+        {"t": 2.0, "text": "Detecting pose", "current_time": 2.0},
+        {"t": 3.0, "text": "frame 90", "current_time": 3.0},
+    ])
+    assert run.signal() == "frame"
+    assert run.frames() == [(1.0, 30), (3.0, 90)]
+
+
+def test_run_without_any_signal_has_no_points():
+    run = ProgressRun("run", samples(["Loading model", "Loading model"]))
+    assert run.signal() is None
+    assert run.frames() == []
+    assert run.summary()["steady_fps"] is None
+
+
+def test_startup_and_steady_throughput():
+    texts = ["frame 0", "frame 0", "frame 0"] + [f"frame {15 * i}" for i in range(1, 9)]
+    run = ProgressRun("run", samples(texts))
+    assert run.startup_seconds() == 1.5
+    assert run.steady_fps() == pytest.approx(30.0)
+    summary = run.summary()
+    assert summary["frames"] == 120
+    assert summary["signal"] == "frame"
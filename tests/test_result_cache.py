@@ -0,0 +1,72 @@
+import io
+import os
+import time
+
+import result_cache
+from result_cache import ResultCache, app_build_fingerprint, file_digest
+
+
+def test_only_passing_entries_are_stored(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("failed", {"passed": False, "duration": 1.0})
+    cache.put("passed", {"passed": True, "duration": 2.0})
+    assert cache.get("failed") is None
+    assert cache.get("passed")["duration"] == 2.0
+
+
+def test_failed_entry_on_disk_is_a_miss(tmp_path):
+    (tmp_path / "old.json").write_text('{"passed": false, "duration": 1.0}')
+    assert ResultCache(str(tmp_path)).get("old") is None
+
+
+def test_expired_entry_is_dropped(tmp_path):
+    cache = ResultCache(str(tmp_path), max_age=60)
+    cache.put("key", {"passed": True, "duration": 1.0})
+    path = tmp_path / "key.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert cache.get("key") is None
+    assert not path.exists()
+
+
+def test_oldest_entries_are_evicted_past_max_bytes(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=250)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"passed": True, "duration": 1.0, "padding": "x" * 50})
+        mtime = time.time() - 10 + i
+        os.utime(tmp_path / f"{key}.json", (mtime, mtime))
+    cache.evict()
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_file_digest_of_missing_file_is_none(tmp_path):
+    assert file_digest(str(tmp_path / "missing.mp4")) is None
+
+
+def serve(monkeypatch, pages):
+    """Point urlopen at an in-memory site: URL -> body"""
+    monkeypatch.setattr(result_cache, "_build_fingerprints", {})
+    monkeypatch.setattr(result_cache, "urlopen",
+                        lambda url, timeout=None: io.BytesIO(pages[url].encode("utf-8")))
+
+
+def test_build_fingerprint_ignores_html_and_bundle_query_strings(monkeypatch):
+    serve(monkeypatch, {"http://app/": '<script src="/main.js?v=1"></script> rendered at 10:00',
+                        "http://app/main.js?v=1": "bundle"})
+    first = app_build_fingerprint("http://app/")
+    serve(monkeypatch, {"http://app/": '<script src="/main.js?v=2"></script> rendered at 10:01',
+                        "http://app/main.js?v=2": "bundle"})
+    assert app_build_fingerprint("http://app/") == first
+
+
+def test_build_fingerprint_changes_with_bundle_contents(monkeypatch):
+    serve(monkeypatch, {"http://app/": '<script src="/main.js"></script>', "http://app/main.js": "v1"})
+    first = app_build_fingerprint("http://app/")
+    serve(monkeypatch, {"http://app/": '<script src="/main.js"></script>', "http://app/main.js": "v2"})
+    assert app_build_fingerprint("http://app/") != first
+
+
+def test_page_without_bundles_is_not_fingerprinted(monkeypatch):
+    serve(monkeypatch, {"http://app/": "<html>static</html>"})
+    assert app_build_fingerprint("http://app/") is None
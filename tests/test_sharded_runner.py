@@ -0,0 +1,118 @@
+import sharded_runner
+from sharded_runner import (DurationHistory, EndpointFailure, ScenarioResult, ShardedRunner,
+                            WorkStealingScheduler)
+
+
+def make_history(tmp_path, durations):
+    history = DurationHistory(str(tmp_path / "durations.json"))
+    history.durations = {name: [seconds] for name, seconds in durations.items()}
+    return history
+
+
+def fake_scenarios(monkeypatch, outcomes):
+    """Replace run_scenario: outcomes maps a scenario to True, False or an exception to raise"""
+    calls = []
+
+    def run_scenario(name, endpoint, base_url):
+        calls.append((name, endpoint))
+        outcome = outcomes[name]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return ScenarioResult(name, endpoint, outcome, 1.0 if outcome else 0.1)
+
+    monkeypatch.setattr(sharded_runner, "run_scenario", run_scenario)
+    return calls
+
+
+def test_history_weight_falls_back_to_mean_of_known_scenarios(tmp_path):
+    history = make_history(tmp_path, {"a": 10, "b": 30})
+    assert history.weight("a") == 10
+    assert history.weight("unseen") == 20
+
+
+def test_deal_is_longest_first_onto_least_loaded_queue(tmp_path):
+    history = make_history(tmp_path, {"a": 50, "b": 40, "c": 30, "d": 20})
+    scheduler = WorkStealingScheduler(["x", "y"], ["d", "c", "b", "a"], history)
+    assert list(scheduler.queues["x"]) == ["a", "d"]
+    assert list(scheduler.queues["y"]) == ["b", "c"]
+
+
+def test_idle_endpoint_steals_from_busiest(tmp_path):
+    history = make_history(tmp_path, {"a": 50, "b": 40, "c": 30})
+    scheduler = WorkStealingScheduler(["x", "y"], ["a", "b", "c"], history)
+    scheduler.queues["y"].clear()
+    assert scheduler.next_for("y") == "a"
+
+
+def test_dependent_waits_until_dependency_passes(tmp_path):
+    history = make_history(tmp_path, {})
+    scheduler = WorkStealingScheduler(["x"], ["part1", "part2"], history, {"part2": ["part1"]})
+    assert scheduler.next_for("x") == "part1"
+    assert "part2" in scheduler.waiting
+    scheduler.complete("part1", True)
+    assert scheduler.next_for("x") == "part2"
+    scheduler.complete("part2", True)
+    assert scheduler.next_for("x") is None
+
+
+def test_dependent_is_skipped_when_dependency_fails(tmp_path):
+    history = make_history(tmp_path, {})
+    scheduler = WorkStealingScheduler(["x"], ["a", "b", "c"], history, {"b": ["a"], "c": ["b"]})
+    assert scheduler.next_for("x") == "a"
+    scheduler.complete("a", False)
+    assert scheduler.next_for("x") is None
+    assert set(scheduler.skipped) == {"b", "c"}
+
+
+def test_unselected_dependency_is_ignored(tmp_path):
+    history = make_history(tmp_path, {})
+    scheduler = WorkStealingScheduler(["x"], ["part2"], history, {"part2": ["part1"]})
+    assert scheduler.next_for("x") == "part2"
+
+
+def test_failed_endpoint_requeues_its_scenarios(tmp_path):
+    history = make_history(tmp_path, {"a": 20, "b": 10})
+    scheduler = WorkStealingScheduler(["x", "y"], ["a", "b"], history)
+    assert scheduler.next_for("x") == "a"
+    assert scheduler.fail_endpoint("x", "a")
+    assert "x" not in scheduler.queues
+    assert sorted(scheduler.queues["y"]) == ["a", "b"]
+
+
+def test_scenario_is_requeued_at_most_max_requeues_times(tmp_path):
+    history = make_history(tmp_path, {})
+    scheduler = WorkStealingScheduler(["x", "y", "z"], ["a"], history)
+    first = next(ep for ep in scheduler.queues if scheduler.queues[ep])
+    scheduler.next_for(first)
+    for _ in range(sharded_runner.MAX_REQUEUES):
+        assert scheduler.fail_endpoint(first, "a")
+        first = next(ep for ep in scheduler.queues if scheduler.queues[ep])
+        scheduler.next_for(first)
+    assert not scheduler.fail_endpoint(first, "a")
+    assert first in scheduler.queues
+
+
+def test_runner_fails_scenario_that_breaks_every_endpoint(tmp_path, monkeypatch):
+    calls = fake_scenarios(monkeypatch, {"a": EndpointFailure("lost the session"), "b": True})
+    runner = ShardedRunner(["x", "y", "z"], ["a", "b"], history_path=str(tmp_path / "d.json"))
+    assert not runner.run()
+    results = {result.name: result for result in runner.results}
+    assert not results["a"].passed
+    assert results["b"].passed
+    assert len([call for call in calls if call[0] == "a"]) == sharded_runner.MAX_REQUEUES + 1
+    assert len(runner.scheduler.queues) == 3 - sharded_runner.MAX_REQUEUES
+
+
+def test_runner_reports_harness_errors_instead_of_hanging(tmp_path, monkeypatch):
+    fake_scenarios(monkeypatch, {"a": RuntimeError("boom"), "b": True})
+    runner = ShardedRunner(["x"], ["a", "b"], history_path=str(tmp_path / "d.json"))
+    assert not runner.run()
+    assert sorted((r.name, r.passed) for r in runner.results) == [("a", False), ("b", True)]
+
+
+def test_runner_records_durations_of_passing_runs_only(tmp_path, monkeypatch):
+    fake_scenarios(monkeypatch, {"a": False, "b": True})
+    runner = ShardedRunner(["x"], ["a", "b"], history_path=str(tmp_path / "d.json"))
+    runner.run()
+    assert "a" not in runner.history.durations
+    assert runner.history.durations["b"] == [1.0]
@@ -0,0 +1,23 @@
+import os
+
+from video_upload import KNEE_EXTENSION_VIDEO, browser_on_this_host, fixture_path
+
+
+def test_local_driver_reads_fixtures_in_place():
+    assert browser_on_this_host(None)
+    assert browser_on_this_host("local")
+
+
+def test_localhost_server_is_not_assumed_to_share_files(monkeypatch):
+    monkeypatch.delenv("HARNESS_BROWSER_SHARES_FILES", raising=False)
+    assert not browser_on_this_host("http://localhost:4444/wd/hub")
+
+
+def test_sharing_can_be_declared(monkeypatch):
+    monkeypatch.setenv("HARNESS_BROWSER_SHARES_FILES", "1")
+    assert browser_on_this_host("http://localhost:9515")
+    assert not browser_on_this_host("http://localhost:9515", shares_files=False)
+
+
+def test_knee_extension_fixture_exists():
+    assert os.path.exists(fixture_path(KNEE_EXTENSION_VIDEO))